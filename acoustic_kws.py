@@ -0,0 +1,122 @@
+import os
+import numpy as np
+import librosa
+from streaming_vad import StreamingVAD, listen_for_speech
+
+# === ACOUSTIC KWS CONFIG ===
+KWS_TEMPLATES = "kws_templates.npz"
+TRIGGER_PHRASES = ["help", "save me"]
+TEMPLATE_REPEATS = 3
+SAMPLE_RATE = 16000
+N_MFCC = 13
+HOP_LENGTH = 160   # 10 ms
+N_FFT = 400        # 25 ms
+DEFAULT_THRESHOLD = 0.35
+THRESHOLD_MARGIN = 1.25
+
+# === FEATURES ===
+def extract_features(samples, sample_rate=SAMPLE_RATE):
+    mfcc = librosa.feature.mfcc(y=np.asarray(samples, dtype=np.float32), sr=sample_rate,
+                                n_mfcc=N_MFCC, n_fft=N_FFT, hop_length=HOP_LENGTH)
+    mfcc = mfcc[1:] - mfcc[1:].mean(axis=1, keepdims=True)  # drop energy, mean-normalise
+    mfcc /= np.maximum(np.linalg.norm(mfcc, axis=0, keepdims=True), 1e-8)
+    return mfcc.T.astype(np.float32)
+
+# Subsequence DTW with slope-constrained steps (1,1), (1,2) and (2,1): each
+# template row only depends on the two rows above it, so a row is computed
+# for every live frame at once. Returns the best average frame distance.
+def subsequence_dtw(template, features):
+    n, m = len(template), len(features)
+    if m < n // 2 or n == 0:
+        return np.inf
+    cost = 1.0 - template @ features.T
+    inf = np.full(m, np.inf, dtype=np.float32)
+    prev2, prev1 = inf, cost[0].copy()
+    for i in range(1, n):
+        row = inf.copy()
+        row[1:] = prev1[:-1]
+        row[2:] = np.minimum(row[2:], prev1[:-2])
+        row[1:] = np.minimum(row[1:], prev2[:-1])
+        prev2, prev1 = prev1, row + cost[i]
+    return float(prev1.min()) / n
+
+# === SPOTTER ===
+class AcousticKeywordSpotter:
+    def __init__(self, templates, thresholds=None):
+        self.templates = templates
+        self.thresholds = thresholds or {}
+
+    @classmethod
+    def load(cls, path=KWS_TEMPLATES):
+        if not os.path.exists(path):
+            return None
+        data = np.load(path)
+        templates, thresholds = {}, {}
+        for key in data.files:
+            kind, label, _ = key.split("__")
+            if kind == "template":
+                templates.setdefault(label, []).append(data[key])
+            else:
+                thresholds[label] = float(data[key])
+        return cls(templates, thresholds)
+
+    def save(self, path=KWS_TEMPLATES):
+        arrays = {}
+        for label, templates in self.templates.items():
+            for i, template in enumerate(templates):
+                arrays[f"template__{label}__{i}"] = template
+            arrays[f"threshold__{label}__0"] = np.float32(self.thresholds.get(label, DEFAULT_THRESHOLD))
+        np.savez(path, **arrays)
+
+    def add_phrase(self, label, clips):
+        templates = [extract_features(clip) for clip in clips]
+        self.templates[label] = templates
+        # Calibrate on how far the user's own repetitions are from each other.
+        cross = [subsequence_dtw(a, b) for i, a in enumerate(templates) for j, b in enumerate(templates) if i != j]
+        cross = [d for d in cross if np.isfinite(d)]
+        self.thresholds[label] = max(cross) * THRESHOLD_MARGIN if cross else DEFAULT_THRESHOLD
+
+    def score(self, samples):
+        features = extract_features(samples)
+        best_label, best_ratio = None, np.inf
+        for label, templates in self.templates.items():
+            distance = min(subsequence_dtw(template, features) for template in templates)
+            ratio = distance / self.thresholds.get(label, DEFAULT_THRESHOLD)
+            if ratio < best_ratio:
+                best_label, best_ratio = label, ratio
+        return best_label, best_ratio
+
+    def detect(self, samples):
+        label, ratio = self.score(samples)
+        return label if ratio <= 1.0 else None
+
+# === ENROLLMENT AND TRIGGER LOOP ===
+def enroll_templates(capture, vad_model, phrases=TRIGGER_PHRASES, repeats=TEMPLATE_REPEATS, path=KWS_TEMPLATES):
+    spotter = AcousticKeywordSpotter.load(path) or AcousticKeywordSpotter({})
+    vad = StreamingVAD(vad_model)
+    for phrase in phrases:
+        clips = []
+        while len(clips) < repeats:
+            print(f"🗣 Say \"{phrase}\" ({len(clips) + 1}/{repeats})...")
+            for segment in listen_for_speech(capture, vad, timeout=10):
+                clips.append(segment)
+                break
+            else:
+                print("❌ Didn't hear anything, let's try again.")
+        spotter.add_phrase(phrase, clips)
+    spotter.save(path)
+    print(f"✅ Trigger phrases saved to {path}")
+    return spotter
+
+# Runs the cheap template match on every VAD speech segment and only calls
+# `confirm(segment, label)` (e.g. a Whisper pass) when a template is close.
+def wait_for_trigger(capture, vad, spotter, confirm=None, timeout=None):
+    for segment in listen_for_speech(capture, vad, timeout=timeout):
+        label = spotter.detect(segment)
+        if label is None:
+            continue
+        print(f"👂 Possible trigger phrase: \"{label}\"")
+        if confirm is None or confirm(segment, label):
+            return segment, label
+        print("↩ Not confirmed, still listening...")
+    return None
@@ -0,0 +1,92 @@
+import json
+import time
+import asyncio
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# === DISPATCH CONFIG ===
+RECEIPT_LOG = "alert_receipts.jsonl"
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 2
+BACKOFF_SECONDS = 1.0
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="alert")
+
+def _log_receipt(receipt, path=RECEIPT_LOG):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(receipt) + "\n")
+
+# === CHANNEL DELIVERY ===
+# Blocking senders (smtplib, Twilio, requests) run on a dedicated thread pool
+# rather than asyncio's default one. A thread can't be cancelled, so when such
+# an attempt passes its timeout it is neither waited for nor retried (a slow
+# but successful calls.create would otherwise place a second call): the
+# channel gets a "pending" receipt and the late outcome is logged when the
+# thread finishes.
+def _log_late(name, receipt, job, start):
+    try:
+        result = job.result()
+    except Exception as e:
+        receipt.update(status="failed_late", error=str(e) or type(e).__name__)
+    else:
+        receipt["status"] = "delivered_late"
+        if result is not None:
+            receipt["result"] = str(result)
+    receipt["seconds"] = round(time.perf_counter() - start, 3)
+    _log_receipt(receipt)
+    print(f"🕓 {name} alert attempt {receipt['attempt']} finished late: {receipt['status']}")
+
+async def _deliver(name, send, timeout, retries, incident_id):
+    for attempt in range(1, retries + 2):
+        start = time.perf_counter()
+        receipt = {
+            "incident": incident_id,
+            "channel": name,
+            "attempt": attempt,
+            "time": datetime.now().isoformat(timespec="seconds"),
+        }
+        job = None
+        try:
+            if asyncio.iscoroutinefunction(send):
+                result = await asyncio.wait_for(send(), timeout)
+            else:
+                job = _executor.submit(send)
+                result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job)), timeout)
+            receipt.update(status="delivered", seconds=round(time.perf_counter() - start, 3))
+            if result is not None:
+                receipt["result"] = str(result)
+            _log_receipt(receipt)
+            print(f"✅ {name} alert delivered in {receipt['seconds']:.1f}s")
+            return receipt
+        except asyncio.TimeoutError:
+            if job is not None:
+                receipt.update(status="pending", seconds=round(time.perf_counter() - start, 3))
+                _log_receipt(receipt)
+                print(f"⏳ {name} alert attempt {attempt} passed {timeout}s; not retrying while it may still go through")
+                job.add_done_callback(lambda done: _log_late(name, dict(receipt), done, start))
+                return receipt
+            error = "timed out"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        receipt.update(status="failed", seconds=round(time.perf_counter() - start, 3), error=error)
+        _log_receipt(receipt)
+        print(f"⚠ {name} alert attempt {attempt} failed: {error}")
+        if attempt <= retries:
+            await asyncio.sleep(BACKOFF_SECONDS * 2 ** (attempt - 1))
+    return receipt
+
+async def dispatch_alerts_async(channels, timeouts=None, retries=DEFAULT_RETRIES, incident_id=None):
+    timeouts = timeouts or {}
+    incident_id = incident_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+    tasks = [
+        asyncio.create_task(_deliver(name, send, timeouts.get(name, DEFAULT_TIMEOUT), retries, incident_id))
+        for name, send in channels.items()
+    ]
+    receipts = await asyncio.gather(*tasks)
+    return {receipt["channel"]: receipt for receipt in receipts}
+
+# Fans every channel out at once, so a slow SMTP handshake no longer delays
+# the phone call. Returns the final receipt per channel.
+def dispatch_alerts(channels, timeouts=None, retries=DEFAULT_RETRIES, incident_id=None):
+    print(f"📣 Dispatching alerts via {', '.join(channels)}...")
+    return asyncio.run(dispatch_alerts_async(channels, timeouts, retries, incident_id))
@@ -0,0 +1,53 @@
+import os
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from email import encoders
+from email.mime.base import MIMEBase
+import soundfile as sf
+from streaming_vad import StreamingVAD
+
+# === ATTACHMENT CONFIG ===
+ENCODE_BLOCK = 16000        # samples handed to the encoder per write
+SUBTYPES = {".flac": "PCM_16", ".ogg": "OPUS", ".wav": "PCM_16"}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="attach")
+
+# === AUDIO ENCODING ===
+# Keeps only the voiced parts of a clip (with Silero's padding), falling back
+# to the whole clip when nothing is voiced so an alert never loses its audio.
+def trim_to_speech(clip, vad_model):
+    vad = StreamingVAD(vad_model, sample_rate=clip.sample_rate)
+    segments = [event for event in vad.process(clip.samples) if event["type"] == "end"] + vad.flush()
+    return clip.select(segments) if segments else clip
+
+# The codec follows the file extension: .flac is lossless and roughly half the
+# size of the WAV, .ogg is Opus and far smaller still.
+def encode_audio(clip, path):
+    subtype = SUBTYPES.get(os.path.splitext(path)[1].lower())
+    with sf.SoundFile(path, "w", samplerate=clip.sample_rate, channels=1, subtype=subtype) as f:
+        for start in range(0, len(clip.samples), ENCODE_BLOCK):
+            f.write(clip.samples[start:start + ENCODE_BLOCK])
+    return path
+
+# Encodes on a background thread while the caller goes on recording the
+# distress details; the returned future resolves to the attachment path.
+# Passing a VAD model trims the clip to its speech first; leave it out to keep
+# the surroundings (traffic, other voices) the ambient recording is for.
+def encode_attachment(clip, path, vad_model=None):
+    if vad_model is not None:
+        clip = trim_to_speech(clip, vad_model)
+    return _executor.submit(encode_audio, clip, path)
+
+# === MIME ===
+# smtplib flattens the whole message in memory before sending, so there is no
+# streaming path to gain from here; keeping the attachment small (FLAC/Opus,
+# optionally trimmed) is what keeps the message small.
+def attach_file(msg, path):
+    maintype, subtype = (mimetypes.guess_type(path)[0] or "application/octet-stream").split("/")
+    part = MIMEBase(maintype, subtype)
+    with open(path, "rb") as f:
+        part.set_payload(f.read())
+    encoders.encode_base64(part)
+    part.add_header("Content-Disposition", "attachment", filename=os.path.basename(path))
+    msg.attach(part)
+    return part
@@ -0,0 +1,45 @@
+import numpy as np
+import soundfile as sf
+import librosa
+import torch
+
+SAMPLE_RATE = 16000
+
+# === IN-MEMORY AUDIO ===
+# Mono float32 samples with their sample rate attached. Silero VAD, Resemblyzer
+# and Whisper all accept 16 kHz float32 arrays directly, so a clip only touches
+# the disk when it is loaded from a fixture or saved as an alert attachment.
+class AudioBuffer:
+    def __init__(self, samples, sample_rate=SAMPLE_RATE):
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32).reshape(-1)
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def from_file(cls, path, sample_rate=SAMPLE_RATE):
+        samples, file_rate = sf.read(path, dtype='float32', always_2d=True)
+        return cls(samples.mean(axis=1), file_rate).resample(sample_rate)
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def duration(self):
+        return len(self.samples) / self.sample_rate
+
+    def resample(self, sample_rate):
+        if sample_rate == self.sample_rate:
+            return self
+        samples = librosa.resample(self.samples, orig_sr=self.sample_rate, target_sr=sample_rate)
+        return AudioBuffer(samples, sample_rate)
+
+    def to_tensor(self):
+        return torch.from_numpy(self.samples)
+
+    def select(self, timestamps):
+        if not timestamps:
+            return AudioBuffer(np.zeros(0, dtype=np.float32), self.sample_rate)
+        return AudioBuffer(np.concatenate([self.samples[t['start']:t['end']] for t in timestamps]), self.sample_rate)
+
+    def save(self, path, subtype='PCM_16'):
+        sf.write(path, self.samples, self.sample_rate, format='WAV', subtype=subtype)
+        return path
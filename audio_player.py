@@ -0,0 +1,88 @@
+import os
+import time
+import threading
+import pygame
+
+# === PLAYBACK CONFIG ===
+MIXER_FREQUENCY = 44100
+MIXER_BUFFER = 512           # small buffer keeps start/stop latency to a few ms
+RINGTONE_CHANNEL = 0
+VOICE_CHANNEL = 1
+
+# === PLAYBACK ENGINE ===
+# Opens the mixer once for the whole process and keeps decoded Sounds in
+# memory. Ringtones and the TTS voice each have a reserved channel on the same
+# output device, so starting, stopping or switching between them never
+# re-opens it and never blocks the caller (unless asked to wait).
+class PlaybackEngine:
+    def __init__(self):
+        pygame.mixer.pre_init(frequency=MIXER_FREQUENCY, size=-16, channels=2, buffer=MIXER_BUFFER)
+        pygame.mixer.init()
+        pygame.mixer.set_reserved(2)
+        self._sounds = {}
+        self._lock = threading.Lock()
+
+    def load(self, path):
+        with self._lock:
+            sound = self._sounds.get(path)
+            if sound is None:
+                sound = self._sounds[path] = pygame.mixer.Sound(path)
+            return sound
+
+    def preload(self, paths):
+        for path in paths:
+            if os.path.exists(path):
+                self.load(path)
+            else:
+                print(f"❌ {path} not found!")
+
+    def play_ringtone(self, path, loops=-1):
+        if not os.path.exists(path):
+            print(f"❌ {path} not found!")
+            return None
+        channel = pygame.mixer.Channel(RINGTONE_CHANNEL)
+        channel.play(self.load(path), loops=loops)
+        return channel
+
+    def stop_ringtone(self):
+        pygame.mixer.Channel(RINGTONE_CHANNEL).stop()
+
+    def play_voice(self, sound, wait=True):
+        channel = pygame.mixer.Channel(VOICE_CHANNEL)
+        channel.play(sound)
+        while wait and channel.get_busy():
+            time.sleep(0.01)
+        return channel
+
+# Stands in when the mixer can't open an output device: ringtones are skipped
+# and load() returns None, so the TTS service speaks through pyttsx3 instead.
+class NullPlaybackEngine:
+    def load(self, path):
+        return None
+
+    def preload(self, paths):
+        pass
+
+    def play_ringtone(self, path, loops=-1):
+        print("🔇 No audio output available; skipping ringtone.")
+        return None
+
+    def stop_ringtone(self):
+        pass
+
+    def play_voice(self, sound, wait=True):
+        return None
+
+_player = None
+_player_lock = threading.Lock()
+
+def get_player():
+    global _player
+    with _player_lock:
+        if _player is None:
+            try:
+                _player = PlaybackEngine()
+            except pygame.error as e:
+                print("⚠️ Could not open the audio mixer:", e)
+                _player = NullPlaybackEngine()
+        return _player
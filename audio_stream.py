@@ -0,0 +1,117 @@
+import threading
+import numpy as np
+import sounddevice as sd
+
+# === CAPTURE CONFIG ===
+SAMPLE_RATE = 16000
+BUFFER_SECONDS = 60
+BLOCK_SIZE = 512
+
+# === RING BUFFER ===
+# Every sample is written twice (at i and i + capacity), so the most recent
+# `capacity` samples are always contiguous and can be handed out as views.
+class RingBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.total_written = 0
+        self._data = np.zeros(2 * capacity, dtype=np.float32)
+        self._pos = 0
+        self._cond = threading.Condition()
+
+    def write(self, samples):
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        skipped = max(0, len(samples) - self.capacity)
+        samples = samples[skipped:]
+        with self._cond:
+            pos = (self._pos + skipped) % self.capacity
+            first = min(len(samples), self.capacity - pos)
+            self._data[pos:pos + first] = samples[:first]
+            self._data[pos + self.capacity:pos + self.capacity + first] = samples[:first]
+            rest = len(samples) - first
+            if rest:
+                self._data[:rest] = samples[first:]
+                self._data[self.capacity:self.capacity + rest] = samples[first:]
+            self._pos = (pos + len(samples)) % self.capacity
+            self.total_written += skipped + len(samples)
+            self._cond.notify_all()
+
+    def latest(self, n_samples):
+        with self._cond:
+            n_samples = min(n_samples, self.capacity, self.total_written)
+            end = self._pos + self.capacity
+            return self._data[end - n_samples:end]
+
+    def read_range(self, start, end):
+        # Absolute sample indices; the returned view stays valid until the
+        # writer has advanced another `capacity - (end - start)` samples.
+        with self._cond:
+            oldest = max(0, self.total_written - self.capacity)
+            if start < oldest or end > self.total_written or start > end:
+                raise ValueError(f"Samples {start}-{end} are not in the buffer ({oldest}-{self.total_written}).")
+            offset = self.total_written - end
+            stop = self._pos + self.capacity - offset
+            return self._data[stop - (end - start):stop]
+
+    def wait_for(self, total, timeout=None):
+        with self._cond:
+            return self._cond.wait_for(lambda: self.total_written >= total, timeout)
+
+# === CAPTURE ENGINE ===
+class AudioCapture:
+    def __init__(self, sample_rate=SAMPLE_RATE, buffer_seconds=BUFFER_SECONDS, block_size=BLOCK_SIZE, device=None):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.device = device
+        self.ring = RingBuffer(int(buffer_seconds * sample_rate))
+        self.overflows = 0
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status.input_overflow:
+            self.overflows += 1
+        self.ring.write(indata[:, 0])
+
+    @property
+    def running(self):
+        return self._stream is not None and self._stream.active
+
+    def start(self):
+        if self.running:
+            return
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate, channels=1, dtype='float32',
+            blocksize=self.block_size, device=self.device, callback=self._callback
+        )
+        self._stream.start()
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def latest(self, seconds):
+        return self.ring.latest(int(seconds * self.sample_rate))
+
+    def record(self, duration, preroll=False):
+        # With preroll the clip ends "now" and reuses audio that is already
+        # buffered, only waiting for whatever is missing since start().
+        n_samples = int(duration * self.sample_rate)
+        if preroll:
+            end = max(self.ring.total_written, n_samples)
+        else:
+            end = self.ring.total_written + n_samples
+        if not self.ring.wait_for(end, timeout=duration + 5):
+            raise RuntimeError("Audio capture stalled; no samples received from the microphone.")
+        return self.ring.read_range(end - n_samples, end).copy()
+
+_capture = None
+_capture_lock = threading.Lock()
+
+def get_capture():
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            _capture = AudioCapture()
+        _capture.start()
+        return _capture
@@ -0,0 +1,227 @@
+import os
+import io
+import sys
+import json
+import glob
+import shutil
+import time
+import tempfile
+import argparse
+import contextlib
+from datetime import datetime
+from unittest import mock
+import numpy as np
+
+# === BENCHMARK CONFIG ===
+FIXTURES_DIR = "bench_fixtures"   # extra WAVs: distress_*.wav / calm_*.wav
+RESULTS_DIR = "bench_results"
+REGISTERED_AUDIO = "registered_audio.wav"
+SAMPLE_RATE = 16000
+DEFAULT_REPEAT = 5
+# Spoken by the TTS service into FIXTURES_DIR when the files are missing, so
+# detect_distress is timed on clips that do and don't contain a keyword.
+SPEECH_FIXTURES = {
+    "distress_tts_police": "Somebody call the police, I am in trouble.",
+    "distress_tts_help": "Please help me, someone is following me.",
+    "calm_tts_weather": "The weather is lovely today and I am walking to the shop.",
+    "calm_tts_dinner": "I will be home at seven, let's have pasta for dinner.",
+}
+SUMMARY_TEXTS = {
+    "short": "Help me please. Someone is following me near the station.",
+    "long": " ".join(["I am walking home from work and a man has been following me for ten minutes.",
+                      "He keeps getting closer and I am scared.",
+                      "Please call the police and send help to my location."] * 20),
+}
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Current resident set size, so each stage can be measured on its own. The
+# process peak (ru_maxrss) only ever grows and is reported once per run.
+def rss_mb():
+    if psutil:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return None
+
+def process_peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+# === FIXTURES ===
+def generate_speech_fixtures():
+    missing = {name: text for name, text in SPEECH_FIXTURES.items()
+               if not os.path.exists(os.path.join(FIXTURES_DIR, name + ".wav"))}
+    if not missing:
+        return
+    try:
+        from tts_service import get_tts
+        tts = get_tts()
+        os.makedirs(FIXTURES_DIR, exist_ok=True)
+        for name, text in missing.items():
+            print(f"🗣 Rendering fixture {name}...")
+            shutil.copyfile(tts.render_file(text), os.path.join(FIXTURES_DIR, name + ".wav"))
+    except Exception as e:
+        print("⚠ Could not render speech fixtures, benchmarking without them:", e)
+
+def load_fixtures(AudioBuffer):
+    fixtures = {}
+    registered = AudioBuffer.from_file(REGISTERED_AUDIO)
+    rng = np.random.default_rng(0)
+    fixtures["registered"] = registered
+    fixtures["registered_noisy"] = AudioBuffer(registered.samples + 0.02 * rng.standard_normal(len(registered)).astype(np.float32))
+    fixtures["silence"] = AudioBuffer(0.001 * rng.standard_normal(6 * SAMPLE_RATE).astype(np.float32))
+    fixtures["noise"] = AudioBuffer(0.1 * rng.standard_normal(6 * SAMPLE_RATE).astype(np.float32))
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.wav"))):
+        fixtures[os.path.splitext(os.path.basename(path))[0]] = AudioBuffer.from_file(path)
+    return fixtures
+
+# === STUBBED SERVICES ===
+class FakeSMTP:
+    sent = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def starttls(self):
+        pass
+
+    def login(self, *args):
+        pass
+
+    def noop(self):
+        return 250, b"OK"
+
+    def send_message(self, msg):
+        FakeSMTP.sent.append(len(msg.as_bytes()))
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+class FakeLocation:
+    ok = True
+    latlng = [12.9716, 77.5946]
+    country = "IN"
+    state = "Karnataka"
+
+@contextlib.contextmanager
+def stubbed_services():
+    with mock.patch("smtplib.SMTP", FakeSMTP), \
+         mock.patch("geocoder.ip", lambda *a, **k: FakeLocation()), \
+         mock.patch("requests.post", side_effect=RuntimeError("network disabled in benchmark")), \
+         mock.patch("sounddevice.InputStream", side_effect=RuntimeError("microphone disabled in benchmark")):
+        yield
+
+# === MEASUREMENT ===
+def measure(fn, arg, repeat, audio_seconds=None):
+    timings = []
+    rss_before = rss_mb()
+    rss_samples = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn(arg)
+            timings.append(time.perf_counter() - start)
+        rss_samples.append(rss_mb())
+    timings = np.array(timings)
+    stats = {
+        "runs": repeat,
+        "p50_ms": round(float(np.percentile(timings, 50)) * 1000, 2),
+        "p95_ms": round(float(np.percentile(timings, 95)) * 1000, 2),
+        "mean_ms": round(float(timings.mean()) * 1000, 2),
+        "calls_per_s": round(repeat / float(timings.sum()), 2),
+    }
+    if rss_before is not None:
+        stats["rss_mb"] = round(max(rss_samples), 1)
+        stats["rss_delta_mb"] = round(max(rss_samples) - rss_before, 1)
+    if audio_seconds:
+        stats["audio_seconds"] = round(audio_seconds, 2)
+        stats["realtime_factor"] = round(audio_seconds / float(np.percentile(timings, 50)), 2)
+    return stats
+
+def run(repeat):
+    import voice_detect
+    import final1
+    from audio_buffer import AudioBuffer
+    from embedding_store import EmbeddingStore
+    from resemblyzer import preprocess_wav
+    from model_registry import prewarm, load_report, get_encoder
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        prewarm(("vad", "encoder", "whisper"), background=False)
+    generate_speech_fixtures()
+    fixtures = load_fixtures(AudioBuffer)
+    results = {"stages": {}, "models": load_report()}
+
+    with tempfile.TemporaryDirectory() as store_dir, stubbed_services():
+        store = EmbeddingStore(store_dir)
+        registered = fixtures["registered"]
+        store.add("bench", get_encoder().embed_utterance(preprocess_wav(registered.samples, source_sr=registered.sample_rate)))
+        voice_detect.enrollments = store
+
+        audio_stages = {
+            "vad": voice_detect.apply_vad,
+            "is_registered_speaker": voice_detect.is_registered_speaker,
+            "detect_distress": voice_detect.detect_distress,
+        }
+        for stage, fn in audio_stages.items():
+            for name, clip in fixtures.items():
+                print(f"⏱ {stage} on {name} ({clip.duration:.1f}s)...")
+                results["stages"][f"{stage}/{name}"] = measure(fn, clip, repeat, clip.duration)
+
+        for name, text in SUMMARY_TEXTS.items():
+            print(f"⏱ summarize_text on {name} text...")
+            results["stages"][f"summarize_text/{name}"] = measure(final1.summarize_text, text, repeat)
+
+        print("⏱ send_email_alert (SMTP and geolocation stubbed)...")
+        results["stages"]["send_email_alert"] = measure(lambda _: final1.send_email_alert(), None, repeat)
+    results["process_peak_rss_mb"] = round(process_peak_rss_mb() or 0.0, 1)
+    return results
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["stages"]
+    print(f"\n📊 p50 change against {baseline_path}:")
+    for stage, stats in results["stages"].items():
+        if stage in baseline:
+            before, after = baseline[stage]["p50_ms"], stats["p50_ms"]
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"{stage:<45} {before:>9.1f} → {after:>9.1f} ms ({change:+.1f}%)")
+
+# === ENTRY POINT ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the distress detection pipeline.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--output", help="JSON file to write (default: bench_results/bench_<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier JSON result to compare p50 latencies against")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    results["timestamp"] = datetime.now().isoformat(timespec="seconds")
+    results["repeat"] = args.repeat
+
+    print(f"\n{'stage':<45} {'p50 ms':>9} {'p95 ms':>9} {'calls/s':>9} {'RSS MB':>9} {'Δ MB':>7}")
+    for stage, stats in results["stages"].items():
+        print(f"{stage:<45} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['calls_per_s']:>9.2f} "
+              f"{stats.get('rss_mb', 0.0):>9.1f} {stats.get('rss_delta_mb', 0.0):>+7.1f}")
+    print(f"Process peak RSS: {results['process_peak_rss_mb']:.1f} MB")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,40 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# === PARALLEL VERIFY + TRANSCRIBE ===
+# Speaker verification (Resemblyzer) and transcription (Whisper) only read the
+# clip, and both spend their time inside torch ops that release the GIL, so
+# a small thread pool runs them side by side on separate cores.
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="detect")
+        return _executor
+
+def _timed(fn, clip):
+    start = time.perf_counter()
+    value = fn(clip)
+    return value, time.perf_counter() - start
+
+def verify_and_transcribe(clip, verify, transcribe):
+    start = time.perf_counter()
+    executor = get_executor()
+    verify_future = executor.submit(_timed, verify, clip)
+    transcribe_future = executor.submit(_timed, transcribe, clip)
+    verified, verify_seconds = verify_future.result()
+    analysis, transcribe_seconds = transcribe_future.result()
+    result = {
+        "verified": bool(verified),
+        "analysis": analysis,
+        "verify_seconds": verify_seconds,
+        "transcribe_seconds": transcribe_seconds,
+        "total_seconds": time.perf_counter() - start,
+    }
+    print(f"⏱ Verification {verify_seconds:.2f}s + transcription {transcribe_seconds:.2f}s "
+          f"finished in {result['total_seconds']:.2f}s")
+    return result
@@ -0,0 +1,127 @@
+import os
+import json
+import threading
+import numpy as np
+
+# === ENROLLMENT STORE CONFIG ===
+ENROLLMENT_DIR = "enrollments"
+EMBEDDING_DIM = 256  # Resemblyzer's d-vector size
+INITIAL_CAPACITY = 16
+
+# === EMBEDDING STORE ===
+# All enrollment utterances of all users live in one float32 matrix that is
+# memory-mapped from `embeddings.f32`; `index.json` records which user owns each
+# row. Rows are L2-normalised, so one matrix-vector product gives the cosine
+# similarity of a live embedding against everyone. Adding users appends rows or
+# reuses freed ones, and removing a user only clears that user's rows.
+class EmbeddingStore:
+    def __init__(self, path=ENROLLMENT_DIR, dim=EMBEDDING_DIM, legacy_path=None):
+        self.path = path
+        self.matrix_path = os.path.join(path, "embeddings.f32")
+        self.index_path = os.path.join(path, "index.json")
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            self.dim = index["dim"]
+            self.rows = index["rows"]
+        else:
+            self.dim = dim
+            self.rows = []
+            self._grow(INITIAL_CAPACITY)
+            self._save_index()
+        self._map()
+        if legacy_path and not self.rows_in_use() and os.path.exists(legacy_path):
+            self.import_legacy(legacy_path)
+
+    # --- storage ---
+    def _map(self):
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(len(self.rows), self.dim))
+        self._refresh_codes()
+
+    def _grow(self, extra_rows):
+        with open(self.matrix_path, "ab") as f:
+            f.write(np.zeros((extra_rows, self.dim), dtype=np.float32).tobytes())
+        self.rows.extend([None] * extra_rows)
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "rows": self.rows}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _refresh_codes(self):
+        self.user_ids = sorted({user for user in self.rows if user is not None})
+        lookup = {user: code for code, user in enumerate(self.user_ids)}
+        self._codes = np.array([lookup.get(user, -1) for user in self.rows], dtype=np.int64)
+
+    # --- enrollment ---
+    def rows_in_use(self):
+        return int((self._codes >= 0).sum())
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def __contains__(self, user_id):
+        return user_id in self.user_ids
+
+    def add(self, user_id, embeddings):
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if embeddings.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional embeddings, got {embeddings.shape[1]}.")
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-8)
+        with self._lock:
+            free = [i for i, user in enumerate(self.rows) if user is None]
+            if len(free) < len(embeddings):
+                missing = len(embeddings) - len(free)
+                self.matrix.flush()
+                del self.matrix
+                start = len(self.rows)
+                self._grow(max(missing, start))
+                free += list(range(start, start + missing))
+                self._map()
+            targets = free[:len(embeddings)]
+            self.matrix[targets] = embeddings
+            self.matrix.flush()
+            for i in targets:
+                self.rows[i] = user_id
+            self._save_index()
+            self._refresh_codes()
+
+    def remove(self, user_id):
+        with self._lock:
+            targets = [i for i, user in enumerate(self.rows) if user == user_id]
+            if not targets:
+                return False
+            self.matrix[targets] = 0.0
+            self.matrix.flush()
+            for i in targets:
+                self.rows[i] = None
+            self._save_index()
+            self._refresh_codes()
+            return True
+
+    def import_legacy(self, legacy_path, user_id="default"):
+        self.add(user_id, np.load(legacy_path))
+        print(f"📦 Imported {legacy_path} as enrolled user '{user_id}'.")
+
+    # --- matching ---
+    def score(self, embedding):
+        query = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-8)
+        with self._lock:
+            similarities = self.matrix @ query
+            codes = self._codes
+            best = np.full(len(self.user_ids), -1.0, dtype=np.float32)
+            used = codes >= 0
+            np.maximum.at(best, codes[used], similarities[used])
+            return dict(zip(self.user_ids, best.tolist()))
+
+    def best_match(self, embedding):
+        scores = self.score(embedding)
+        if not scores:
+            return None, -1.0
+        user_id = max(scores, key=scores.get)
+        return user_id, scores[user_id]
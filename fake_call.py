@@ -1,7 +1,8 @@
-import pyttsx3
 import time
-import os
-from playsound import playsound
+from audio_player import get_player
+from tts_service import get_tts
+
+RINGTONE = "ringtone.mp3"
 
 # Default 5 fake call messages
 default_lines = [
@@ -14,30 +15,18 @@ default_lines = [
 
 # Text-to-Speech function
 def speak_text(text):
-    engine = pyttsx3.init()
-    engine.setProperty("rate", 160)
-    engine.setProperty("volume", 1.0)
-    voices = engine.getProperty("voices")
-    if len(voices) > 1:
-        engine.setProperty("voice", voices[1].id)
-    else:
-        engine.setProperty("voice", voices[0].id)
-    engine.say(text)
-    engine.runAndWait()
+    get_tts().speak(text)
 
 # Function to play the fake call
 def play_fake_call():
     print("\n📞 FAKE CALL INCOMING...")
 
-    # Step 1: Play ringtone
+    # Step 1: Play ringtone (keeps ringing while you pick a message)
     print("🎶 Playing ringtone...")
-    if os.path.exists("ringtone.mp3"):
-        try:
-            playsound("ringtone.mp3")
-        except Exception as e:
-            print("⚠️ Error playing ringtone:", e)
-    else:
-        print("❌ ringtone.mp3 not found!")
+    try:
+        get_player().play_ringtone(RINGTONE)
+    except Exception as e:
+        print("⚠️ Error playing ringtone:", e)
 
     # Step 2: Show options
     print("\n💬 Choose your fake call message:")
@@ -58,6 +47,7 @@ def play_fake_call():
     else:
         print("❌ Invalid choice. Using default option 1.")
         final_line = default_lines[0]
+    get_player().stop_ringtone()
 
     # Step 3: Speak message
     time.sleep(2)
@@ -66,6 +56,8 @@ def play_fake_call():
 
 # ✅ This part must be present to start the program
 if __name__ == "__main__":
+    get_player().preload([RINGTONE])
+    get_tts().prerender(default_lines)
     while True:
         play_fake_call()
         again = input("\n🔁 Do you want to simulate another fake call? (y/n): ").lower()
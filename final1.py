@@ -1,36 +1,47 @@
 import os
-import numpy as np
 import torch
-import sounddevice as sd
-import soundfile as sf
-from resemblyzer import VoiceEncoder, preprocess_wav
-from scipy.spatial.distance import cosine
-import whisper
-import librosa
+from resemblyzer import preprocess_wav
+from audio_stream import get_capture
+from audio_buffer import AudioBuffer
+from model_registry import get_vad_model, get_encoder, prewarm
+from whisper_pool import get_whisper, warm_whisper
+from detection_pipeline import get_executor
+from streaming_transcriber import StreamingTranscriber, transcribe_while_recording
+from streaming_vad import StreamingVAD, listen_for_speech
+from recognizer import get_recognizer, RecognitionError
+from acoustic_kws import AcousticKeywordSpotter, enroll_templates, wait_for_trigger, KWS_TEMPLATES
+from alert_dispatcher import dispatch_alerts
+from mail_transport import SMTPTransport
+from attachments import encode_attachment, attach_file
+from message_templates import MessageTemplates, MESSAGE_TEMPLATES
+from incident_manager import IncidentManager
+from listener_daemon import ListenerDaemon, TriplePressTrigger, HotwordTrigger, ScheduleTrigger
+from location_provider import LocationProvider, ip_location, describe_fix
+from embedding_store import EmbeddingStore
 import re
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
 import json
 from collections import Counter
-import speech_recognition as sr
 from datetime import datetime
 import cohere
 from twilio.rest import Client as TwilioClient
+from twilio.http.http_client import TwilioHttpClient
 from dotenv import load_dotenv
-import geocoder
 
 # === CONFIGURATION ===
-REGISTERED_EMBEDDING = "registered_embed.npy"
+REGISTERED_EMBEDDING = "registered_embed.npy"  # legacy single-user enrollment, imported on first run
+ENROLLMENT_DIR = "enrollments"
+REGISTERED_USER = os.getenv("REGISTERED_USER") or "default"
 REGISTERED_AUDIO = "registered_audio.wav"
-LIVE_AUDIO = "live_audio.wav"
-AMBIENT_AUDIO = "ambient_audio.wav"
+AMBIENT_AUDIO = "ambient_audio.flac"  # .ogg for Opus
 DISTRESS_REPORT = "distress_report.txt"
 SAMPLE_RATE = 16000
 RECORD_SECONDS = 10
 AMBIENT_RECORD_SECONDS = 20
+TRIM_AMBIENT_TO_SPEECH = False   # True drops the non-speech parts of the ambient clip
+TRIGGER_TIMEOUT = 30
+CHECKIN_SECONDS = int(os.getenv("CHECKIN_SECONDS") or 0)  # 0 disables scheduled check-ins
 THRESHOLD = 0.75
 DISTRESS_KEYWORDS = [
     "help", "fire", "emergency", "danger", "call police",
@@ -48,28 +59,22 @@ TWILIO_SID = os.getenv("TWILIO_SID") or "AC6515508846e35b104184a020ff00e2d3"
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN") or "d13011781646bc967d914609b5d087ab"
 TWILIO_NUMBER = os.getenv("TWILIO_NUMBER") or "+16198808861"
 TO_NUMBER = os.getenv("TO_NUMBER") or "+919353683861"
+TWILIO_TIMEOUT = 15   # seconds per HTTP request; Twilio's default client never times out
 
 co = cohere.Client(COHERE_API_KEY)
 
 # === INIT MODELS ===
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 torch.set_num_threads(1)
-print("\U0001F680 Loading models...")
-vad_model, utils = torch.hub.load(repo_or_dir="snakers4/silero-vad", model="silero_vad", force_reload=False)
-(get_speech_timestamps, _, read_audio, _, _) = utils
-encoder = VoiceEncoder()
-whisper_model = whisper.load_model("base")
+trigger_spotter = AcousticKeywordSpotter.load(KWS_TEMPLATES)
+enrollments = EmbeddingStore(ENROLLMENT_DIR, legacy_path=REGISTERED_EMBEDDING)
 
 # === UTILITY FUNCTIONS ===
-def get_location_details():
-    try:
-        g = geocoder.ip('me')
-        if g.ok and g.latlng:
-            lat, lon = g.latlng
-            return lat, lon, g.country or "Unknown", g.state or "Unknown", f"https://www.google.com/maps?q={lat},{lon}"
-    except:
-        pass
-    return None, None, "Unknown", "Unknown", "Location unavailable."
+location = LocationProvider([ip_location])
+mailer = SMTPTransport(EMAIL_ADDRESS, EMAIL_PASSWORD)
+messages = MessageTemplates()
+incidents = IncidentManager()
+recognizer = get_recognizer()
 
 def summarize_text(text, max_sentences=3):
     sentences = re.split(r'[.!?]', text)
@@ -78,16 +83,23 @@ def summarize_text(text, max_sentences=3):
     top_sentences = [s for _, s in sorted(scored_sentences, reverse=True)[:max_sentences]]
     return ' '.join(top_sentences)
 
-def send_email_alert():
-    subject = "\U0001F6A8 Distress Signal Detected"
-    lat, lon, country, state, location_url = get_location_details()
+def send_email_alert(fix=None, incident=None):
+    update = incident["updates"] if incident else 0
+    subject = f"\U0001F6A8 Distress Update #{update} (incident {incident['id']})" if update else "\U0001F6A8 Distress Signal Detected"
+    fix = fix or location.current()
+    lat, lon, country, state, location_url = fix["lat"], fix["lon"], fix["country"], fix["state"], fix["url"]
+    headline = (
+        "\U0001F501 Update: The registered user triggered another distress signal in the same incident.\n\n"
+        if update else "\U0001F6A8 Alert: A distress signal was detected from the registered user.\n\n"
+    )
     body = (
-        "\U0001F6A8 Alert: A distress signal was detected from the registered user.\n\n"
+        headline +
         f"\U0001F30D Country: {country}\n"
         f"\U0001F3D9️ State: {state}\n"
         f"\U0001F4CD Latitude: {lat}\n"
         f"\U0001F4CD Longitude: {lon}\n"
-        f"\U0001F5FA️ Google Maps Link: {location_url}\n\n"
+        f"\U0001F5FA️ Google Maps Link: {location_url}\n"
+        f"\U0001F4E1 Fix: {describe_fix(fix)}\n\n"
         "Immediate attention may be required.\n"
         "An ambient audio recording and verbal distress report are attached."
     )
@@ -98,133 +110,224 @@ def send_email_alert():
     msg.attach(MIMEText(body, "plain"))
     for attachment in [AMBIENT_AUDIO, DISTRESS_REPORT]:
         if os.path.exists(attachment):
-            with open(attachment, "rb") as f:
-                part = MIMEBase("application", "octet-stream")
-                part.set_payload(f.read())
-                encoders.encode_base64(part)
-                part.add_header("Content-Disposition", f"attachment; filename={attachment}")
-                msg.attach(part)
+            attach_file(msg, attachment)
     try:
-        server = smtplib.SMTP("smtp.gmail.com", 587)
-        server.starttls()
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        mailer.send(msg)
         print("\U0001F4E7 Email alert sent successfully.")
     except Exception as e:
         print("❌ Failed to send email:", e)
+        raise
 
-def generate_emergency_message():
+def generate_emergency_message(fix=None):
     current_time = datetime.now().strftime("%I:%M %p")
-    lat, lon, _, _, location_link = get_location_details()
-    prompt = (
-        f"Create a short emergency voice message from someone in danger. "
-        f"Name is John, time is {current_time}, and location is shared in the link: {location_link}. "
-        f"Make it sound human, natural, and urgent."
-    )
+    location_link = (fix or location.current())["url"]
+    return messages.render(current_time, location_link)
+
+def cohere_generate(prompt):
     response = co.generate(model="command", prompt=prompt, max_tokens=100, temperature=0.8)
     return response.generations[0].text.strip()
 
 def make_emergency_call(message):
-    twilio_client = TwilioClient(TWILIO_SID, TWILIO_AUTH_TOKEN)
+    twilio_client = TwilioClient(TWILIO_SID, TWILIO_AUTH_TOKEN, http_client=TwilioHttpClient(timeout=TWILIO_TIMEOUT))
     call = twilio_client.calls.create(
         to=TO_NUMBER,
         from_=TWILIO_NUMBER,
         twiml=f'<Response><Say voice="alice">{message}</Say></Response>'
     )
     print(f"📞 Emergency call triggered. Call SID: {call.sid}")
+    return call.sid
+
+def send_sms_alert(fix=None, incident=None):
+    location_link = (fix or location.current())["url"]
+    if incident and incident["updates"]:
+        body = f"🔁 Update #{incident['updates']}: distress signal repeated. Latest location: {location_link}. New details by email."
+    else:
+        body = ("🚨 Distress signal detected from registered user. Immediate action may be needed! "
+                f"Location: {location_link}. Check your email for details.")
+    twilio_client = TwilioClient(TWILIO_SID, TWILIO_AUTH_TOKEN, http_client=TwilioHttpClient(timeout=TWILIO_TIMEOUT))
+    sms = twilio_client.messages.create(
+        to=TO_NUMBER,
+        from_=TWILIO_NUMBER,
+        body=body
+    )
+    print(f"📱 SMS alert sent. Message SID: {sms.sid}")
+    return sms.sid
 
-def record_audio(filename, duration=RECORD_SECONDS):
-    print(f"\n🎤 Recording for {duration} seconds...")
-    audio = sd.rec(int(duration * SAMPLE_RATE), samplerate=SAMPLE_RATE, channels=1, dtype='float32')
-    sd.wait()
-    sf.write(filename, audio, SAMPLE_RATE, format='WAV', subtype='PCM_16')
-    print(f"✅ Audio saved: {filename}")
+def record_audio(duration=RECORD_SECONDS, preroll=False):
+    if preroll:
+        print(f"\n🎤 Collecting the last {duration} seconds of audio...")
+    else:
+        print(f"\n🎤 Recording for {duration} seconds...")
+    clip = AudioBuffer(get_capture().record(duration, preroll=preroll), SAMPLE_RATE)
+    print(f"✅ Audio captured ({clip.duration:.1f}s)")
+    return clip
 
 def register_user_voice():
+    global trigger_spotter
     print("📝 Registering your voice. Please speak naturally.")
-    record_audio(REGISTERED_AUDIO, duration=RECORD_SECONDS)
-    wav = preprocess_wav(REGISTERED_AUDIO)
-    embed = encoder.embed_utterance(wav)
-    np.save(REGISTERED_EMBEDDING, embed)
+    clip = record_audio(duration=RECORD_SECONDS)
+    clip.save(REGISTERED_AUDIO)
+    wav = preprocess_wav(clip.samples, source_sr=clip.sample_rate)
+    embed = get_encoder().embed_utterance(wav)
+    enrollments.add(REGISTERED_USER, embed)
     print("🔐 Voice registration complete.")
+    trigger_spotter = enroll_templates(get_capture(), get_vad_model())
+    messages.refine_in_background(cohere_generate)
 
-def verify_speaker():
-    record_audio(LIVE_AUDIO, duration=RECORD_SECONDS)
-    live_wav = preprocess_wav(LIVE_AUDIO)
-    live_embed = encoder.embed_utterance(live_wav)
-    if os.path.exists(REGISTERED_EMBEDDING):
-        registered_embed = np.load(REGISTERED_EMBEDDING)
-        distance = cosine(registered_embed, live_embed)
-        print(f"🔍 Cosine distance to registered voice: {distance:.3f}")
+def verify_speaker(clip):
+    live_wav = preprocess_wav(clip.samples, source_sr=clip.sample_rate)
+    live_embed = get_encoder().embed_utterance(live_wav)
+    if len(enrollments):
+        user_id, similarity = enrollments.best_match(live_embed)
+        distance = 1 - similarity
+        print(f"🔍 Cosine distance to registered voice: {distance:.3f} (closest user: {user_id})")
         return distance < THRESHOLD
     else:
         print("⚠ No registered voice found. Skipping speaker verification.")
         return True
 
-def record_distress_details():
+def write_distress_report(transcript, summary):
+    with open(DISTRESS_REPORT, "w", encoding='utf-8') as f:
+        f.write("Full Transcript:\n" + transcript + "\n\nSummary:\n" + summary)
+
+# Transcribes the 15 s description while it is recorded. Speaker verification
+# starts on the recorded audio while Whisper decodes its last step, and runs
+# even when transcription fails. Returns (verified, transcript, summary);
+# `verified` is None when there was no audio or verification itself errored,
+# which alerts anyway rather than dropping a possible emergency.
+def record_distress_details(verify):
     print("\n🎙️ Please describe your emergency situation (15 seconds)...")
-    record_audio("detailed_report.wav", duration=15)
+    verification = []
+    def recorded(samples):
+        if len(samples):
+            verification.append(get_executor().submit(verify, AudioBuffer(samples, SAMPLE_RATE)))
+    transcript = ""
     try:
-        audio, sr = librosa.load("detailed_report.wav", sr=16000, mono=True)
-        audio_tensor = torch.from_numpy(audio).float()
-        result = whisper_model.transcribe(audio_tensor.numpy(), language='en', fp16=False)
-        transcript = result.get("text", "").strip()
-        if not transcript:
-            return None, None
-        summary = summarize_text(transcript)
-        with open(DISTRESS_REPORT, "w", encoding='utf-8') as f:
-            f.write("Full Transcript:\n" + transcript + "\n\nSummary:\n" + summary)
-        return transcript, summary
+        transcriber = StreamingTranscriber(get_whisper())
     except Exception as e:
-        print("❌ Failed to transcribe or summarize:", e)
-        return None, None
+        print("❌ Failed to load Whisper:", e)
+        transcriber = None
+    try:
+        if transcriber is None:
+            recorded(record_audio(duration=15).samples)
+        else:
+            _, transcript = transcribe_while_recording(get_capture(), transcriber, 15, on_recorded=recorded)
+            transcript = transcript.strip()
+    except Exception as e:
+        print("❌ Failed to record or transcribe the details:", e)
+    verified = None
+    if verification:
+        try:
+            verified = bool(verification[0].result())
+        except Exception as e:
+            print("⚠ Speaker verification errored:", e)
+    summary = summarize_text(transcript) if transcript else None
+    return verified, transcript or None, summary
 
-def listen_and_detect():
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        print("🎙 Listening for distress keywords... Speak now.")
-        audio = r.listen(source)
+def confirm_trigger(segment, label):
+    result = get_whisper().transcribe(segment, language='en', fp16=False)
+    text = result.get("text", "").lower()
+    print("🗣 You said:", text)
+    return any(keyword in text for keyword in DISTRESS_KEYWORDS)
+
+def detect_trigger():
+    if trigger_spotter is not None:
+        print("🎙 Listening for your trigger phrase... Speak now.")
+        vad = StreamingVAD(get_vad_model())
+        hit = wait_for_trigger(get_capture(), vad, trigger_spotter, confirm=confirm_trigger, timeout=TRIGGER_TIMEOUT)
+        return hit is not None
+    print("🎙 Listening for distress keywords... Speak now.")
+    for segment in listen_for_speech(get_capture(), StreamingVAD(get_vad_model()), timeout=TRIGGER_TIMEOUT):
         try:
-            text = r.recognize_google(audio).lower()
-            print("🗣 You said:", text)
-            if any(keyword in text for keyword in DISTRESS_KEYWORDS):
-                print("🚨 Distress detected!")
-                if not verify_speaker():
-                    print("🔒 Speaker verification failed. Ignoring alert.")
-                    return
-                record_audio(AMBIENT_AUDIO, duration=AMBIENT_RECORD_SECONDS)
-                transcript, summary = record_distress_details()
-                send_email_alert()
-                message = generate_emergency_message()
-                make_emergency_call(message)
-                for f in [AMBIENT_AUDIO, DISTRESS_REPORT]:
-                    if os.path.exists(f):
-                        os.remove(f)
-            else:
-                print("✅ No distress signal detected.")
-        except sr.UnknownValueError:
-            print("❌ Could not understand audio.")
-        except sr.RequestError as e:
+            text = recognizer.transcribe(segment).lower()
+        except RecognitionError as e:
             print("⚠ Speech recognition error:", e)
+            return None
+        if not text:
+            print("❌ Could not understand audio.")
+            return None
+        print("🗣 You said:", text)
+        return any(keyword in text for keyword in DISTRESS_KEYWORDS)
+    print("❌ No speech detected.")
+    return None
+
+def listen_and_detect():
+    detected = detect_trigger()
+    if detected is None:
+        return
+    if not detected:
+        print("✅ No distress signal detected.")
+        return
+    print("🚨 Distress detected!")
+    incidents.run(handle_incident)
+
+def handle_incident(incident):
+    ambient = record_audio(duration=AMBIENT_RECORD_SECONDS, preroll=True)
+    ambient_encoded = encode_attachment(ambient, AMBIENT_AUDIO, get_vad_model() if TRIM_AMBIENT_TO_SPEECH else None)
+    verified, transcript, summary = record_distress_details(verify_speaker)
+    try:
+        ambient_encoded.result()
+    except Exception as e:
+        # The alert must go out even without its ambient recording.
+        print("⚠ Could not encode the ambient audio; sending alerts without it:", e)
+        if os.path.exists(AMBIENT_AUDIO):
+            os.remove(AMBIENT_AUDIO)
+    if verified is None:
+        print("⚠ Could not verify the speaker; alerting anyway.")
+    elif not verified:
+        print("🔒 Speaker verification failed. Ignoring alert.")
+        remove_attachments()
+        return
+    if transcript:
+        write_distress_report(transcript, summary)
+    fix = location.current()
+    print(f"📍 Location for this incident: {fix['url']} ({describe_fix(fix)})")
+    incidents.notify(
+        incident,
+        lambda: dispatch_alerts({
+            "email": lambda: send_email_alert(fix, incident),
+            "call": lambda: make_emergency_call(generate_emergency_message(fix)),
+            "sms": lambda: send_sms_alert(fix, incident),
+        }, incident_id=incident["id"]),
+        lambda: dispatch_alerts({
+            "email": lambda: send_email_alert(fix, incident),
+            "sms": lambda: send_sms_alert(fix, incident),
+        }, incident_id=incident["id"]),
+    )
+    remove_attachments()
+
+def remove_attachments():
+    for f in [AMBIENT_AUDIO, DISTRESS_REPORT]:
+        if os.path.exists(f):
+            os.remove(f)
+
+def handle_activation(event):
+    if event["trigger"] == "hotword":
+        print("🚨 Distress detected!")
+        incidents.run(handle_incident)
+    else:
+        listen_and_detect()
 
-def simulate_power_button_press():
-    press_count = 0
-    print("🖲 Simulating Power Button... Press Enter to simulate each press.")
-    while True:
-        input("Press Enter (power button)...")
-        press_count += 1
-        print(f"Power button pressed {press_count} time(s)")
-        if press_count == 3:
-            print("🎯 Triple press detected! Activating voice detection...")
-            listen_and_detect()
-            break
+def run_daemon():
+    get_capture()
+    location.start_background_refresh()
+    mailer.start_keepalive()
+    if not os.path.exists(MESSAGE_TEMPLATES):
+        messages.refine_in_background(cohere_generate)
+    prewarm(("vad", "encoder"))
+    warm_whisper()
+    triggers = [TriplePressTrigger()]
+    if trigger_spotter is not None:
+        triggers.append(HotwordTrigger(get_capture(), get_vad_model(), trigger_spotter, confirm=confirm_trigger))
+    if CHECKIN_SECONDS:
+        triggers.append(ScheduleTrigger(CHECKIN_SECONDS))
+    ListenerDaemon(triggers, handle_activation).run_forever()
 
 # === MAIN ===
 if __name__ == "__main__":
-    if not os.path.exists(REGISTERED_EMBEDDING):
+    if not len(enrollments):
         register_user_voice()
-    simulate_power_button_press()
+    run_daemon()
 
 
 
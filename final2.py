@@ -1,12 +1,14 @@
 import tkinter as tk
 import threading
 import time
-import os
-import pygame
-import pyttsx3
-import speech_recognition as sr
+from tts_service import get_tts
+from audio_player import get_player
+from recognizer import get_recognizer, RecognitionError, CHAT_WHISPER_MODEL
+from mic_session import get_mic_session
+from intent_engine import IntentEngine, Conversation
 
 # === FAKE CALL (LOW SUS) CONFIG ===
+RINGTONE = "ringtonee.mp3"
 default_lines = [
     "Hey, I’m almost there. Just 5 minutes away.",
     "I’m right around the corner, hang tight.",
@@ -16,23 +18,7 @@ default_lines = [
 ]
 
 def speak_text(text):
-    engine = pyttsx3.init()
-    engine.setProperty("rate", 160)
-    engine.setProperty("volume", 1.0)
-    voices = engine.getProperty("voices")
-    engine.setProperty("voice", voices[1].id if len(voices) > 1 else voices[0].id)
-    engine.say(text)
-    engine.runAndWait()
-
-def play_ringtone_loop():
-    ringtone_path = "ringtonee.mp3"
-    if not os.path.exists(ringtone_path):
-        print("❌ ringtonee.mp3 not found!")
-        return
-
-    pygame.mixer.init()
-    pygame.mixer.music.load(ringtone_path)
-    pygame.mixer.music.play(-1)
+    get_tts().speak(text)
 
 def run_fake_call():
     print("\n💬 Choose your fake call message:")
@@ -54,13 +40,12 @@ def run_fake_call():
         print("❌ Invalid choice. Using default option 1.")
         final_line = default_lines[0]
 
-    ringtone_thread = threading.Thread(target=play_ringtone_loop)
-    ringtone_thread.start()
+    get_player().play_ringtone(RINGTONE)
 
     while True:
         action = input("👉 Your action (r = receive, d = decline): ").strip().lower()
         if action in ['r', 'd']:
-            pygame.mixer.music.stop()
+            get_player().stop_ringtone()
             break
 
     if action == 'r':
@@ -70,74 +55,72 @@ def run_fake_call():
         print("📵 Call declined.")
 
 # === VOICE AI (MID SUS) CONFIG ===
+AI_VOICE_INDEX = 0
+AI_RATE = 200  # pyttsx3's default speaking rate
+AI_GREETING = "Hello? Is anyone there?"
+LISTEN_TIMEOUT = 15
+CHAT_LANGUAGE = "en"  # loads intents/<language>.json
 try:
-    ai_engine = pyttsx3.init()
+    tts = get_tts()
 except RuntimeError as e:
     print(f"Error initializing TTS engine: {e}")
-    ai_engine = None
+    tts = None
 
 def speak_ai(text):
-    if ai_engine:
-        ai_engine.say(text)
-        ai_engine.runAndWait()
+    if tts:
+        tts.speak(text, voice_index=AI_VOICE_INDEX, rate=AI_RATE)
     else:
         print(f"(TTS not available) AI: {text}")
 
+recognizer = get_recognizer(model_name=CHAT_WHISPER_MODEL)
+
 def get_audio():
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        print("Listening...")
-        r.adjust_for_ambient_noise(source)
-        audio = r.listen(source)
+    print("Listening...")
+    samples = get_mic_session().listen(timeout=LISTEN_TIMEOUT)
+    if samples is None:
+        return ""
 
     try:
         print("Recognizing...")
-        text = r.recognize_google(audio)
-        print(f"You said: {text}")
-        return text
-    except sr.UnknownValueError:
-        print("Could not understand audio")
+        text = recognizer.transcribe(samples)
+    except RecognitionError as e:
+        print(e)
         return ""
-    except sr.RequestError as e:
-        print(f"Could not request results; {e}")
+    if not text:
+        print("Could not understand audio")
         return ""
+    print(f"You said: {text}")
+    return text
 
-def get_ai_response(user_input):
-    user_input_lower = user_input.lower()
-    if "hello" in user_input_lower or "hi" in user_input_lower:
-        return "Hey there! How can I help you?"
-    elif "how are you" in user_input_lower:
-        return "I'm doing well, thank you for asking."
-    elif "fine" in user_input_lower or "good" in user_input_lower:
-        return "That's great to hear!"
-    elif "scared" in user_input_lower or "nervous" in user_input_lower:
-        return "It's okay, I'm here. Just focus on your breathing."
-    elif "see anyone" in user_input_lower or "around you" in user_input_lower:
-        return "Can you describe what you see around you?"
-    elif "walking" in user_input_lower or "going somewhere" in user_input_lower:
-        return "Are you heading somewhere specific?"
-    elif "bye" in user_input_lower or "exit" in user_input_lower:
-        return "Okay, talk to you later!"
-    else:
-        return "Hmm, that's interesting. Tell me more."
+intents = IntentEngine.load(CHAT_LANGUAGE)
+
+def get_ai_response(user_input, conversation):
+    return conversation.respond(user_input)
 
 def run_voice_chat():
     print("Initiating Fake Call with AI...")
-    speak_ai("Hello? Is anyone there?")
+    get_mic_session()
+    speak_ai(AI_GREETING)
+    conversation = Conversation(intents)
 
     while True:
         user_utterance = get_audio()
         if user_utterance:
-            ai_response = get_ai_response(user_utterance)
-            print(f"AI: {ai_response}")
-            speak_ai(ai_response)
-            if "bye" in user_utterance.lower() or "exit" in user_utterance.lower():
+            reply = get_ai_response(user_utterance, conversation)
+            print(f"AI: {reply['response']}")
+            speak_ai(reply["response"])
+            if reply["end"]:
                 break
         else:
             print("No speech detected. Please try again.")
 
 # === GUI ===
 def start_gui():
+    get_player().preload([RINGTONE])
+    if tts:
+        tts.prerender(default_lines)
+        replies = [r for intent in intents.intents for r in intent["responses"]] + intents.fallback
+        tts.prerender([AI_GREETING] + replies, voice_index=AI_VOICE_INDEX, rate=AI_RATE)
     root = tk.Tk()
     root.title("Fake Call AI - Suspicion Selector")
     root.geometry("350x200")
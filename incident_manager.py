@@ -0,0 +1,80 @@
+import time
+import threading
+from datetime import datetime
+
+# === INCIDENT CONFIG ===
+MERGE_WINDOW_SECONDS = 300   # triggers this close together belong to one incident
+MAX_PIPELINES = 1            # record/transcribe/alert pipelines allowed at once
+DELIVERED_STATUSES = ("delivered", "pending")   # a pending call may still connect
+
+def new_incident():
+    now = time.time()
+    return {
+        "id": datetime.now().strftime("%Y%m%d-%H%M%S"),
+        "opened": now,
+        "last_trigger": now,
+        "triggers": 0,
+        "alerted": False,
+        "updates": 0,
+    }
+
+# `alert()` returns either dispatch_alerts' receipts per channel or a plain
+# success flag.
+def alert_delivered(result):
+    if isinstance(result, dict):
+        return any(receipt.get("status") in DELIVERED_STATUSES for receipt in result.values())
+    return bool(result)
+
+# === INCIDENT MANAGER ===
+# Triggers within MERGE_WINDOW_SECONDS of the previous one join the open
+# incident. The first pipeline to reach notify() sends the full alert; later
+# ones send follow-up updates instead, but only once a full alert got through
+# on at least one channel. Triggers that arrive while
+# MAX_PIPELINES are already running are counted on the incident and dropped.
+class IncidentManager:
+    def __init__(self, merge_window=MERGE_WINDOW_SECONDS, max_pipelines=MAX_PIPELINES):
+        self.merge_window = merge_window
+        self.incident = None
+        self._lock = threading.Lock()
+        self._alerting = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pipelines)
+
+    def trigger(self):
+        now = time.time()
+        with self._lock:
+            incident = self.incident
+            if incident is None or now - incident["last_trigger"] > self.merge_window:
+                incident = self.incident = new_incident()
+                print(f"🆕 Opened incident {incident['id']}")
+            else:
+                print(f"🔁 Trigger merged into incident {incident['id']}")
+            incident["triggers"] += 1
+            incident["last_trigger"] = now
+            return incident
+
+    def run(self, pipeline):
+        incident = self.trigger()
+        if not self._slots.acquire(blocking=False):
+            print(f"⏳ Incident {incident['id']} is already being handled; trigger noted.")
+            return None
+        try:
+            return pipeline(incident)
+        finally:
+            self._slots.release()
+
+    def notify(self, incident, alert, follow_up):
+        with self._alerting:
+            with self._lock:
+                first = not incident["alerted"]
+                if not first:
+                    incident["updates"] += 1
+            if first:
+                result = alert()
+                if alert_delivered(result):
+                    with self._lock:
+                        incident["alerted"] = True
+                else:
+                    print(f"⚠ No alert channel got through for incident {incident['id']}; "
+                          "the next trigger sends the full alert again.")
+                return result
+        return follow_up()
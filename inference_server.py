@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import queue
+import socket
+import threading
+import http.client
+import socketserver
+from urllib.parse import urlparse, parse_qs, urlencode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import torch
+from model_registry import get_encoder, get_whisper_model
+from embedding_store import EmbeddingStore
+
+# === SERVER CONFIG ===
+HOST = "127.0.0.1"
+PORT = 8765
+SAMPLE_RATE = 16000
+ENROLLMENT_DIR = "enrollments"
+VERIFY_THRESHOLD = 0.75
+MAX_BATCH = int(os.getenv("INFER_MAX_BATCH") or 8)
+BATCH_WAIT_MS = int(os.getenv("INFER_BATCH_WAIT_MS") or 30)
+TASKS = ("verify", "transcribe")
+MAX_BODY_BYTES = int(os.getenv("INFER_MAX_BODY_BYTES") or 120 * SAMPLE_RATE * 4)   # two minutes of float32
+WHISPER_WINDOW_SECONDS = 30  # Whisper decodes at most this much of a clip
+
+# === BATCHED MODEL CALLS ===
+# Same steps as VoiceEncoder.embed_utterance, except the partial mel windows of
+# every clip in the batch go through the network in a single forward pass.
+def embed_batch(wavs):
+    from resemblyzer import audio
+    encoder = get_encoder()
+    mels, owners = [], []
+    for i, wav in enumerate(wavs):
+        wav_slices, mel_slices = encoder.compute_partial_slices(len(wav), rate=1.3, min_coverage=0.75)
+        if wav_slices[-1].stop >= len(wav):
+            wav = np.pad(wav, (0, wav_slices[-1].stop - len(wav)), "constant")
+        mel = audio.wav_to_mel_spectrogram(wav)
+        mels.extend(mel[s] for s in mel_slices)
+        owners.extend([i] * len(mel_slices))
+    with torch.no_grad():
+        partials = encoder(torch.from_numpy(np.array(mels)).to(encoder.device)).cpu().numpy()
+    owners = np.array(owners)
+    embeds = []
+    for i in range(len(wavs)):
+        raw = partials[owners == i].mean(axis=0)
+        embeds.append(raw / np.linalg.norm(raw, 2))
+    return embeds
+
+# Whisper pads every clip to 30 s, so a batch is one encoder pass over a
+# stacked mel tensor followed by batched greedy decoding.
+def transcribe_batch(clips, language="en"):
+    import whisper
+    model = get_whisper_model()
+    mels = torch.stack([
+        whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(clip)), n_mels=model.dims.n_mels)
+        for clip in clips
+    ]).to(model.device)
+    options = whisper.DecodingOptions(language=language, fp16=False, without_timestamps=True)
+    return [result.text.strip() for result in whisper.decode(model, mels, options)]
+
+def _add_error(result, error):
+    message = str(error) or type(error).__name__
+    result["error"] = f"{result['error']}; {message}" if "error" in result else message
+
+# === MICRO-BATCHER ===
+# Requests from all connections land on one queue. The worker waits up to
+# BATCH_WAIT_MS for more to arrive, sorts what it has by length so clips of
+# similar size share a batch, and answers each request through its own Event.
+class MicroBatcher:
+    def __init__(self, store, max_batch=MAX_BATCH, wait_ms=BATCH_WAIT_MS):
+        self.store = store
+        self.max_batch = max_batch
+        self.wait = wait_ms / 1000
+        self.jobs = queue.Queue()
+        self.batches = 0
+        threading.Thread(target=self._run, name="micro-batcher", daemon=True).start()
+
+    def submit(self, stream, samples, tasks=TASKS):
+        job = {"stream": stream, "samples": samples, "tasks": tasks, "done": threading.Event(), "result": None}
+        self.jobs.put(job)
+        job["done"].wait()
+        return job["result"]
+
+    def _collect(self):
+        jobs = [self.jobs.get()]
+        deadline = time.monotonic() + self.wait
+        while len(jobs) < self.max_batch * 2:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(self.jobs.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return sorted(jobs, key=lambda job: len(job["samples"]))
+
+    def _run(self):
+        while True:
+            jobs = self._collect()
+            for start in range(0, len(jobs), self.max_batch):
+                self._process(jobs[start:start + self.max_batch])
+
+    # A batch that fails is retried one clip at a time, so a bad clip (e.g.
+    # one preprocess_wav trims to nothing) only fails its own request.
+    @staticmethod
+    def _batched(items, batch_fn, results):
+        if not items:
+            return []
+        try:
+            return list(zip([i for i, _ in items], batch_fn([x for _, x in items])))
+        except Exception:
+            pass
+        outputs = []
+        for i, x in items:
+            try:
+                outputs.append((i, batch_fn([x])[0]))
+            except Exception as e:
+                _add_error(results[i], e)
+        return outputs
+
+    def _process(self, jobs):
+        started = time.perf_counter()
+        self.batches += 1
+        results = [{"stream": job["stream"], "batch": self.batches, "batch_size": len(jobs)} for job in jobs]
+        wavs = []
+        for i, job in enumerate(jobs):
+            if "verify" not in job["tasks"]:
+                continue
+            try:
+                from resemblyzer import preprocess_wav
+                wav = preprocess_wav(job["samples"], source_sr=SAMPLE_RATE)
+                if not len(wav):
+                    raise ValueError("no voiced audio left after preprocessing")
+                wavs.append((i, wav))
+            except Exception as e:
+                _add_error(results[i], e)
+        for i, embed in self._batched(wavs, embed_batch, results):
+            try:
+                user_id, similarity = self.store.best_match(embed)
+            except Exception as e:
+                _add_error(results[i], e)
+                continue
+            results[i].update(user=user_id, similarity=round(similarity, 4), verified=similarity > VERIFY_THRESHOLD)
+        clips = [(i, job["samples"]) for i, job in enumerate(jobs) if "transcribe" in job["tasks"]]
+        for i, text in self._batched(clips, transcribe_batch, results):
+            # pad_or_trim cuts longer clips, so tell the stream its transcript is partial.
+            results[i]["transcript"] = text
+            results[i]["truncated"] = len(jobs[i]["samples"]) > WHISPER_WINDOW_SECONDS * SAMPLE_RATE
+        seconds = round(time.perf_counter() - started, 3)
+        for job, result in zip(jobs, results):
+            result["batch_seconds"] = seconds
+            job["result"] = result
+            job["done"].set()
+
+# === HTTP FRONT END ===
+# POST /infer?stream=<id>&tasks=verify,transcribe with raw little-endian
+# float32 16 kHz mono samples as the body; the reply is one JSON result.
+class InferenceHandler(BaseHTTPRequestHandler):
+    batcher = None
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/infer":
+            self.send_error(404)
+            return
+        params = parse_qs(url.query)
+        stream = params.get("stream", ["anonymous"])[0]
+        tasks = tuple(t for t in params.get("tasks", [",".join(TASKS)])[0].split(",") if t in TASKS)
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            self.send_error(400, "invalid Content-Length")
+            return
+        if length <= 0:
+            self.send_error(400, "expected a positive Content-Length")
+            return
+        if length > MAX_BODY_BYTES:
+            self.send_error(413, f"body over {MAX_BODY_BYTES} bytes")
+            return
+        body = self.rfile.read(length)
+        if len(body) % 4:
+            self.send_error(400, "body must be whole float32 samples")
+            return
+        samples = np.frombuffer(body, dtype="<f4").copy()
+        if not len(samples) or not tasks:
+            self.send_error(400, "expected float32 audio and at least one task")
+            return
+        payload = json.dumps(self.batcher.submit(stream, samples, tasks)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else "unix"
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def serve(host=HOST, port=PORT, unix_socket=None, store=None):
+    InferenceHandler.batcher = MicroBatcher(store or EmbeddingStore(ENROLLMENT_DIR))
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, InferenceHandler)
+        print(f"🧠 Inference server listening on {unix_socket}")
+    else:
+        server = ThreadingHTTPServer((host, port), InferenceHandler)
+        print(f"🧠 Inference server listening on http://{host}:{port}")
+    server.serve_forever()
+
+# === CLIENT ===
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=60):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+class InferenceClient:
+    def __init__(self, host=HOST, port=PORT, unix_socket=None, timeout=60):
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.timeout = timeout
+
+    def infer(self, samples, stream="default", tasks=TASKS):
+        if self.unix_socket:
+            conn = _UnixConnection(self.unix_socket, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            body = np.ascontiguousarray(samples, dtype="<f4").tobytes()
+            conn.request("POST", "/infer?" + urlencode({"stream": stream, "tasks": ",".join(tasks)}), body,
+                         {"Content-Type": "application/octet-stream"})
+            response = conn.getresponse()
+            if response.status != 200:
+                raise RuntimeError(f"Inference server returned {response.status}: {response.reason}")
+            return json.loads(response.read())
+        finally:
+            conn.close()
+
+# === ENTRY POINT ===
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Batch speaker verification and transcription for many devices.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="Listen on this Unix socket instead of TCP.")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.unix)
@@ -0,0 +1,79 @@
+import os
+import json
+from keyword_spotter import KeywordSpotter, normalize_tokens, STRONG_CUTOFF
+
+# === INTENT CONFIG ===
+INTENTS_DIR = "intents"       # one <language>.json rule file per language
+CONTEXT_TURNS = 2             # turns an intent's context_out stays active
+CONTEXT_BONUS = 0.5           # added to intents whose context_in is active
+MIN_FUZZY_LENGTH = 5          # shorter words must match a pattern word exactly
+
+# === INTENT ENGINE ===
+# Every pattern of every intent is compiled into one KeywordSpotter, so an
+# utterance is scored against all intents in a single pass over its words
+# (with the spotter's fuzzy token matching absorbing small ASR errors). An
+# intent's score is the sum of its matched patterns, weighted by their length
+# in words; intents with `context_in` only compete while that context is live.
+class IntentEngine:
+    def __init__(self, config):
+        self.intents = config["intents"]
+        self.fallback = config.get("fallback") or ["Hmm, that's interesting. Tell me more."]
+        self._intents_by_phrase = {}
+        patterns = []
+        for index, intent in enumerate(self.intents):
+            for pattern in intent["patterns"]:
+                phrase = ' '.join(normalize_tokens(pattern))
+                if phrase:
+                    self._intents_by_phrase.setdefault(phrase, []).append(index)
+                    patterns.append(phrase)
+        self.spotter = KeywordSpotter(patterns, min_fuzzy_length=MIN_FUZZY_LENGTH)
+
+    @classmethod
+    def load(cls, language="en", directory=INTENTS_DIR):
+        with open(os.path.join(directory, f"{language}.json"), encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def score(self, text, contexts=()):
+        scores = {}
+        for match in self.spotter.scan(normalize_tokens(text), cutoff=STRONG_CUTOFF):
+            for index in self._intents_by_phrase[match["phrase"]]:
+                required = self.intents[index].get("context_in")
+                if required and required not in contexts:
+                    continue
+                bonus = CONTEXT_BONUS if required and index not in scores else 0.0
+                scores[index] = scores.get(index, 0.0) + match["score"] * match["tokens"] + bonus
+        return scores
+
+# === CONVERSATION ===
+# Per-call state: which contexts are live and how often each intent has
+# answered, so repeated intents rotate through their responses.
+class Conversation:
+    def __init__(self, engine):
+        self.engine = engine
+        self.contexts = {}
+        self.turns = 0
+        self._answered = {}
+
+    def _pick(self, key, responses):
+        count = self._answered.get(key, 0)
+        self._answered[key] = count + 1
+        return responses[count % len(responses)]
+
+    def respond(self, text):
+        self.turns += 1
+        scores = self.engine.score(text, self.contexts)
+        self.contexts = {name: turns - 1 for name, turns in self.contexts.items() if turns > 1}
+        if not scores:
+            return {"intent": None, "response": self._pick(None, self.engine.fallback), "end": False, "score": 0.0}
+        # Highest score wins; ties go to an intent that ends the call ("good
+        # bye" is both "good" and "bye"), then to the one listed first.
+        index = max(scores, key=lambda i: (scores[i], bool(self.engine.intents[i].get("end")), -i))
+        intent = self.engine.intents[index]
+        if intent.get("context_out"):
+            self.contexts[intent["context_out"]] = CONTEXT_TURNS
+        return {
+            "intent": intent["name"],
+            "response": self._pick(intent["name"], intent["responses"]),
+            "end": bool(intent.get("end")),
+            "score": round(scores[index], 3),
+        }
@@ -0,0 +1,160 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+STRONG_CUTOFF = 0.8
+PARTIAL_CUTOFF = 0.7
+PHRASE_GAP = 2                # filler words allowed between the words of a phrase
+MIN_PARTIAL_HITS = 2          # partial phrases needed when nothing matches strongly
+
+def normalize_tokens(text):
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return re.sub(r'[^\w\s]', '', text).split()
+
+# Insert/delete-only edit distance (len(a) + len(b) - 2 * LCS). It is a metric,
+# so it can index the BK-tree. The resulting similarity is the LCS ratio, which
+# equals difflib's ratio for typical ASR slips and is never below it (difflib's
+# matching blocks are one common subsequence, not necessarily the longest).
+def edit_distance(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    previous = [0] * (len(b) + 1)
+    for ca in a:
+        current = [0]
+        for j, cb in enumerate(b, 1):
+            current.append(previous[j - 1] + 1 if ca == cb else max(previous[j], current[j - 1]))
+        previous = current
+    return len(a) + len(b) - 2 * previous[-1]
+
+def similarity(a, b, distance=None):
+    if distance is None:
+        distance = edit_distance(a, b)
+    return 1.0 - distance / max(len(a) + len(b), 1)
+
+# === BK-TREE ===
+# Metric tree over the keyword vocabulary: a lookup only visits children whose
+# edge distance lies within `radius` of the query's distance to the node.
+class BKTree:
+    def __init__(self, words=()):
+        self.root = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if self.root is None:
+            self.root = (word, {})
+            return
+        node = self.root
+        while True:
+            distance = edit_distance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                return
+            node = child
+
+    def search(self, word, radius):
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_word, children = stack.pop()
+            distance = edit_distance(word, node_word)
+            if distance <= radius:
+                found.append((node_word, distance))
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return found
+
+# === KEYWORD SPOTTER ===
+# Phrases are compiled into a token trie (for multi-word matching in one pass
+# over the transcript) and their vocabulary into a BK-tree (for fuzzy token
+# lookup). Token lookups are cached, so repeated words cost one dict hit.
+# Words or tokens shorter than `min_fuzzy_length` only match exactly; short
+# words sit within one edit of too many others ("by"/"bye", "hit"/"hi").
+class KeywordSpotter:
+    def __init__(self, phrases, min_fuzzy_length=0):
+        self.min_fuzzy_length = min_fuzzy_length
+        self.phrases = []
+        self._trie = {}
+        self._phrases_by_token = {}
+        for phrase in phrases:
+            tokens = tuple(normalize_tokens(phrase))
+            if not tokens or tokens in self.phrases:
+                continue
+            phrase_id = len(self.phrases)
+            self.phrases.append(tokens)
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+                self._phrases_by_token.setdefault(token, set()).add(phrase_id)
+            node.setdefault(None, []).append(phrase_id)
+        self._vocabulary = BKTree(self._phrases_by_token)
+        self._lookup = lru_cache(maxsize=8192)(self._fuzzy_lookup)
+
+    def phrase_text(self, phrase_id):
+        return ' '.join(self.phrases[phrase_id])
+
+    def _fuzzy_lookup(self, word, cutoff):
+        # similarity >= cutoff implies distance <= 2 * (1 - cutoff) * len(word) / cutoff;
+        # the epsilon keeps float error from truncating an exact bound (e.g. 0.999...) down.
+        radius = int(2 * (1 - cutoff) * len(word) / cutoff + 1e-9)
+        return tuple(
+            (token, score)
+            for token, distance in self._vocabulary.search(word, radius)
+            for score in [similarity(word, token, distance)]
+            if score >= cutoff and (distance == 0 or min(len(word), len(token)) >= self.min_fuzzy_length)
+        )
+
+    # Up to `max_gap` unmatched words may sit between the words of a phrase
+    # ("call the police" still matches "call police"). Each phrase is reported
+    # once per start position, with its best-scoring alignment.
+    def scan(self, words, cutoff=STRONG_CUTOFF, max_gap=PHRASE_GAP):
+        best = {}
+        active = []
+        for position, word in enumerate(words):
+            hits = self._lookup(word, cutoff)
+            next_active = []
+            for node, start, scores, gap in active + [(self._trie, position, (), 0)]:
+                if scores and gap < max_gap:
+                    next_active.append((node, start, scores, gap + 1))
+                for token, score in hits:
+                    child = node.get(token)
+                    if child is None:
+                        continue
+                    child_scores = scores + (score,)
+                    for phrase_id in child.get(None, ()):
+                        match = {
+                            "phrase": self.phrase_text(phrase_id),
+                            "start": start,
+                            "end": position + 1,
+                            "tokens": len(child_scores),
+                            "score": sum(child_scores) / len(child_scores),
+                        }
+                        key = (phrase_id, start)
+                        if key not in best or match["score"] > best[key]["score"]:
+                            best[key] = match
+                    next_active.append((child, start, child_scores, 0))
+            active = next_active
+        return sorted(best.values(), key=lambda m: (m["start"], m["end"]))
+
+    def token_hits(self, words, cutoff=PARTIAL_CUTOFF):
+        phrase_ids = set()
+        for word in set(words):
+            for token, _ in self._lookup(word, cutoff):
+                phrase_ids |= self._phrases_by_token[token]
+        return {self.phrase_text(phrase_id) for phrase_id in phrase_ids}
+
+    # Strong phrases match every word (allowing gaps); partial phrases only
+    # share a word at the looser cutoff. Returns (matches, strong, partial).
+    def classify(self, words, strong_cutoff=STRONG_CUTOFF, partial_cutoff=PARTIAL_CUTOFF):
+        matches = self.scan(words, cutoff=strong_cutoff)
+        strong = {m["phrase"] for m in matches}
+        partial = self.token_hits(words, cutoff=partial_cutoff) - strong
+        return matches, strong, partial
+
+    def detect(self, words, min_partial=MIN_PARTIAL_HITS):
+        _, strong, partial = self.classify(words)
+        return bool(strong) or len(partial) >= min_partial
@@ -0,0 +1,133 @@
+import abc
+import time
+import queue
+import threading
+from streaming_vad import StreamingVAD, listen_for_speech
+
+# === DAEMON CONFIG ===
+PRESS_COUNT = 3
+PRESS_WINDOW_SECONDS = 5     # presses must land this close together
+
+def make_event(trigger, data=None):
+    return {"trigger": trigger, "time": time.time(), "data": data}
+
+# === TRIGGERS ===
+# A trigger runs on its own thread and calls `daemon.emit(name, data)` when it
+# fires. Anything that listens to the microphone holds `daemon.mic` while it
+# does, so it never shares the (stateful) VAD model with a running activation.
+class Trigger(abc.ABC):
+    name = "trigger"
+
+    def start(self, daemon):
+        thread = threading.Thread(target=self.run, args=(daemon,), name=f"trigger-{self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    @abc.abstractmethod
+    def run(self, daemon):
+        ...
+
+class TriplePressTrigger(Trigger):
+    name = "press"
+
+    def __init__(self, presses=PRESS_COUNT, window=PRESS_WINDOW_SECONDS, read=input):
+        self.presses = presses
+        self.window = window
+        self.read = read
+
+    def run(self, daemon):
+        print(f"🖲 Power button: press Enter {self.presses} times within {self.window}s to activate.")
+        times = []
+        while not daemon.stopped.is_set():
+            self.read()
+            now = time.time()
+            times = [t for t in times if now - t <= self.window] + [now]
+            print(f"Power button pressed {len(times)} time(s)")
+            if len(times) >= self.presses:
+                times = []
+                daemon.emit(self.name)
+
+class HotwordTrigger(Trigger):
+    name = "hotword"
+
+    def __init__(self, capture, vad_model, spotter, confirm=None):
+        self.capture = capture
+        self.vad_model = vad_model
+        self.spotter = spotter
+        self.confirm = confirm
+
+    def run(self, daemon):
+        vad = StreamingVAD(self.vad_model)
+        print("👂 Hotword trigger listening in the background.")
+        # Checked every frame, so an activation gets the microphone within one
+        # frame even while speech or TV keeps the VAD busy.
+        def yield_mic():
+            return not daemon.idle.is_set() or daemon.stopped.is_set()
+        while not daemon.stopped.is_set():
+            daemon.idle.wait()
+            with daemon.mic:
+                for segment in listen_for_speech(self.capture, vad, stop=yield_mic):
+                    label = self.spotter.detect(segment)
+                    if label is None:
+                        continue
+                    print(f"👂 Possible trigger phrase: \"{label}\"")
+                    if self.confirm is None or self.confirm(segment, label):
+                        daemon.emit(self.name, {"segment": segment, "label": label})
+                        break
+
+class ScheduleTrigger(Trigger):
+    name = "schedule"
+
+    def __init__(self, interval_seconds):
+        self.interval_seconds = interval_seconds
+
+    def run(self, daemon):
+        while not daemon.stopped.wait(self.interval_seconds):
+            daemon.emit(self.name)
+
+# === EVENT LOOP ===
+# Models, the capture stream, the SMTP session etc. are loaded once by the
+# caller before run_forever(); every activation after that reuses them.
+# Activations are handled one at a time on the calling thread.
+class ListenerDaemon:
+    def __init__(self, triggers, handle):
+        self.triggers = triggers
+        self.handle = handle
+        self.events = queue.Queue()
+        self.mic = threading.Lock()
+        self.idle = threading.Event()
+        self.idle.set()
+        self.stopped = threading.Event()
+        self.activations = 0
+
+    def emit(self, trigger, data=None):
+        self.events.put(make_event(trigger, data))
+
+    def stop(self):
+        self.stopped.set()
+        self.events.put(None)
+
+    def run_forever(self):
+        for trigger in self.triggers:
+            trigger.start(self)
+        print(f"🛡 Listener armed ({', '.join(t.name for t in self.triggers)}). Ctrl+C to stop.")
+        try:
+            while not self.stopped.is_set():
+                event = self.events.get()
+                if event is None:
+                    break
+                self.activations += 1
+                print(f"🎯 Activation #{self.activations} from {event['trigger']} trigger")
+                self.idle.clear()
+                try:
+                    with self.mic:
+                        self.handle(event)
+                except Exception as e:
+                    print("❌ Activation failed:", e)
+                finally:
+                    self.idle.set()
+                print("🛡 Re-armed.")
+        except KeyboardInterrupt:
+            print("\n👋 Listener stopped.")
+        finally:
+            self.stopped.set()
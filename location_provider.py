@@ -0,0 +1,106 @@
+import time
+import threading
+import geocoder
+
+# === LOCATION CONFIG ===
+LOCATION_MAX_AGE = 120       # seconds a fix is reused before resolving again
+REFRESH_SECONDS = 60         # background refresh interval while armed
+IP_ACCURACY_METERS = 5000    # IP geolocation is only city-level
+
+def maps_link(lat, lon):
+    return f"https://www.google.com/maps?q={lat},{lon}"
+
+def make_fix(lat, lon, country="Unknown", state="Unknown", accuracy=None, source="unknown"):
+    return {
+        "lat": lat,
+        "lon": lon,
+        "country": country or "Unknown",
+        "state": state or "Unknown",
+        "url": maps_link(lat, lon),
+        "accuracy": accuracy,
+        "source": source,
+        "timestamp": time.time(),
+    }
+
+def unknown_fix():
+    return {
+        "lat": None, "lon": None, "country": "Unknown", "state": "Unknown",
+        "url": "Location unavailable.", "accuracy": None, "source": "none", "timestamp": time.time(),
+    }
+
+def describe_fix(fix):
+    accuracy = f"±{fix['accuracy']:.0f} m" if fix.get("accuracy") is not None else "accuracy unknown"
+    age = time.time() - fix["timestamp"]
+    return f"{fix['source']}, {accuracy}, {age:.0f}s old"
+
+def ip_location():
+    g = geocoder.ip('me')
+    if g.ok and g.latlng:
+        lat, lon = g.latlng
+        return make_fix(lat, lon, g.country, g.state, accuracy=IP_ACCURACY_METERS, source="ip")
+    return None
+
+def _accuracy(fix):
+    return fix["accuracy"] if fix.get("accuracy") is not None else float("inf")
+
+# === LOCATION PROVIDER ===
+# Resolves a fix from the first source that answers (e.g. browser GPS, then IP
+# geolocation), caches it with its timestamp and accuracy, and hands the same
+# fix to every alert channel. While armed, a background thread keeps the cache
+# warm so an incident normally finds a fresh fix without waiting. Sources are
+# called outside the lock (the browser can block for its whole timeout), and a
+# coarser fix never replaces a more accurate one that is still within max_age.
+class LocationProvider:
+    def __init__(self, sources, max_age=LOCATION_MAX_AGE, refresh_seconds=REFRESH_SECONDS):
+        self.sources = sources
+        self.max_age = max_age
+        self.refresh_seconds = refresh_seconds
+        self._fix = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _store(self, fix):
+        with self._lock:
+            current = self._fix
+            if (current is None or time.time() - current["timestamp"] > self.max_age
+                    or _accuracy(fix) <= _accuracy(current)):
+                self._fix = current = fix
+            return current
+
+    def refresh(self):
+        for source in self.sources:
+            try:
+                fix = source()
+            except Exception as e:
+                print(f"⚠ Location source {getattr(source, '__name__', source)} failed:", e)
+                continue
+            if fix is not None:
+                return self._store(fix)
+        return self._fix
+
+    # Push sources (e.g. a browser watchPosition stream) hand new fixes in here.
+    def update(self, fix):
+        self._store(fix)
+
+    def current(self, max_age=None):
+        max_age = self.max_age if max_age is None else max_age
+        fix = self._fix
+        if fix is None or time.time() - fix["timestamp"] > max_age:
+            fix = self.refresh()
+        return dict(fix) if fix else unknown_fix()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_seconds)
+
+    def start_background_refresh(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="location-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,99 @@
+import time
+import threading
+import webbrowser
+from collections import deque
+from flask import Flask, request, jsonify, render_template_string
+from location_provider import make_fix
+
+# === LOCATION SERVICE CONFIG ===
+LOCATION_PORT = 5001
+HISTORY_SIZE = 20          # recent fixes kept for the movement trail
+TRAIL_POINTS = 5           # fixes listed in an alert
+BROWSER_WAIT_SECONDS = 15
+
+html_page = '''
+<!DOCTYPE html>
+<html><head><title>Geolocation</title></head>
+<body><h2>Allow Location Access</h2>
+<p id="status">Waiting for location...</p>
+<script>
+navigator.geolocation.watchPosition(function(position) {
+    fetch("/send_location", {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({lat: position.coords.latitude, lon: position.coords.longitude, accuracy: position.coords.accuracy})
+    }).then(() => document.getElementById("status").innerText =
+        "✅ Sharing location (last update " + new Date().toLocaleTimeString() + "). Keep this tab open.");
+}, function(error) {
+    document.getElementById("status").innerText = "❌ " + error.message;
+}, {enableHighAccuracy: true, maximumAge: 10000});
+</script>
+</body></html>
+'''
+
+# === BROWSER LOCATION SERVICE ===
+# One Flask server for the lifetime of the process. The page keeps pushing
+# watchPosition updates; callers block on a condition until a fix newer than
+# the one they already have arrives, and the last few fixes are kept as a trail.
+class BrowserLocationService:
+    def __init__(self, port=LOCATION_PORT, history_size=HISTORY_SIZE):
+        self.port = port
+        self.history = deque(maxlen=history_size)
+        self._condition = threading.Condition()
+        self._listeners = []
+        self._started = False
+        self.app = Flask(__name__)
+        self.app.add_url_rule('/', 'index', lambda: render_template_string(html_page))
+        self.app.add_url_rule('/send_location', 'send_location', self._receive, methods=['POST'])
+
+    def _receive(self):
+        data = request.json
+        if data.get("lat") is None or data.get("lon") is None:
+            return jsonify(status="ignored")
+        fix = make_fix(data["lat"], data["lon"], "Detected via Browser", "Detected via Browser",
+                       accuracy=data.get("accuracy"), source="browser")
+        with self._condition:
+            self.history.append(fix)
+            self._condition.notify_all()
+        for listener in self._listeners:
+            listener(fix)
+        return jsonify(status="success")
+
+    def start(self, open_browser=True):
+        with self._condition:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self.app.run, kwargs={"port": self.port, "debug": False},
+                         name="location-server", daemon=True).start()
+        if open_browser:
+            webbrowser.open(f"http://localhost:{self.port}")
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def latest(self):
+        with self._condition:
+            return self.history[-1] if self.history else None
+
+    def wait_for_fix(self, timeout=BROWSER_WAIT_SECONDS, newer_than=None):
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                fix = self.history[-1] if self.history else None
+                if fix is not None and (newer_than is None or fix["timestamp"] > newer_than):
+                    return fix
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def trail(self, points=TRAIL_POINTS):
+        with self._condition:
+            return list(self.history)[-points:]
+
+def format_trail(fixes):
+    return "\n".join(
+        f"  {time.strftime('%I:%M:%S %p', time.localtime(fix['timestamp']))}  {fix['url']}"
+        for fix in fixes
+    )
@@ -0,0 +1,156 @@
+import os
+import time
+import smtplib
+import threading
+
+# === SMTP CONFIG ===
+# Point SMTP_HOST/SMTP_PORT at a local stand-in (e.g. `python -m aiosmtpd -n -l localhost:8025`
+# with SMTP_STARTTLS=0) to exercise the transport without touching Gmail.
+SMTP_HOST = os.getenv("SMTP_HOST") or "smtp.gmail.com"
+SMTP_PORT = int(os.getenv("SMTP_PORT") or 587)
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"
+SMTP_TIMEOUT = 20
+KEEPALIVE_SECONDS = 60
+
+# === SMTP TRANSPORT ===
+# Holds one authenticated SMTP session. start_keepalive() does the connect,
+# STARTTLS and login in the background when the device is armed, then NOOPs
+# periodically so the server doesn't drop the session. A dead session is
+# re-opened by the keepalive, or once mid-send if it dies during an alert.
+class SMTPTransport:
+    def __init__(self, username=None, password=None, host=SMTP_HOST, port=SMTP_PORT,
+                 starttls=SMTP_STARTTLS, timeout=SMTP_TIMEOUT, keepalive_seconds=KEEPALIVE_SECONDS):
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.starttls = starttls
+        self.timeout = timeout
+        self.keepalive_seconds = keepalive_seconds
+        self.handshake_seconds = None
+        self._server = None
+        self._data_sent = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _connect(self):
+        start = time.perf_counter()
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.handshake_seconds = time.perf_counter() - start
+        # Note when DATA goes out: past that point the server may already have
+        # accepted the message, so a failure must not be resent.
+        send_data = server.data
+        def data(msg):
+            self._data_sent = True
+            return send_data(msg)
+        server.data = data
+        self._server = server
+        print(f"📮 SMTP session to {self.host}:{self.port} ready in {self.handshake_seconds:.2f}s")
+
+    def _drop(self):
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _alive(self):
+        if self._server is None:
+            return False
+        try:
+            return self._server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def warm(self):
+        with self._lock:
+            if not self._alive():
+                self._drop()
+                self._connect()
+
+    # A session that turns out to be dead before DATA is re-opened and the
+    # message resent once. Rejections, and any failure after DATA was sent
+    # (e.g. a timeout waiting for the final reply), are raised as they are.
+    def send(self, msg):
+        with self._lock:
+            if self._server is None:
+                self._connect()
+            self._data_sent = False
+            try:
+                self._server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                if self._data_sent:
+                    raise
+                self._drop()
+                self._connect()
+                self._server.send_message(msg)
+
+    def _keepalive_loop(self):
+        while True:
+            try:
+                self.warm()
+            except Exception as e:
+                print("⚠ SMTP keepalive failed:", e)
+            if self._stop.wait(self.keepalive_seconds):
+                return
+
+    def start_keepalive(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._keepalive_loop, name="smtp-keepalive", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            if self._server is not None:
+                try:
+                    self._server.quit()
+                except Exception:
+                    pass
+                self._server = None
+
+# === HANDSHAKE BENCHMARK ===
+if __name__ == "__main__":
+    import argparse
+    from email.mime.text import MIMEText
+
+    parser = argparse.ArgumentParser(description="Compare a cold SMTP send with sends over a warm session.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--starttls", action="store_true")
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    parser.add_argument("--count", type=int, default=5)
+    args = parser.parse_args()
+
+    def message(i):
+        msg = MIMEText(f"Transport benchmark message {i}")
+        msg["From"] = msg["To"] = "bench@localhost"
+        msg["Subject"] = f"bench {i}"
+        return msg
+
+    transport = SMTPTransport(args.user, args.password, args.host, args.port, starttls=args.starttls)
+    start = time.perf_counter()
+    transport.send(message(0))
+    cold = time.perf_counter() - start
+    warm = []
+    for i in range(1, args.count + 1):
+        start = time.perf_counter()
+        transport.send(message(i))
+        warm.append(time.perf_counter() - start)
+    transport.close()
+    print(f"handshake   {transport.handshake_seconds * 1000:>8.1f} ms")
+    print(f"cold send   {cold * 1000:>8.1f} ms")
+    print(f"warm send   {sum(warm) / len(warm) * 1000:>8.1f} ms (mean of {len(warm)})")
@@ -0,0 +1,82 @@
+import os
+import json
+import random
+import threading
+
+# === MESSAGE TEMPLATE CONFIG ===
+MESSAGE_TEMPLATES = "message_templates.json"
+USER_NAME = "John"
+REFINED_TEMPLATES = 3
+DEFAULT_TEMPLATES = [
+    "This is an emergency message from {name}. I am in danger and need help right now. "
+    "It is {time}. My location is {location}. Please send help immediately.",
+    "Help, this is {name}. Something is wrong and I can't talk safely. "
+    "As of {time} I am here: {location}. Please call the police and come find me.",
+]
+REFINE_PROMPT = (
+    "Write a short emergency voice message from someone in danger, to be read out on a phone call. "
+    "Use the exact placeholders {name}, {time} and {location} where the caller's name, the current time "
+    "and a map link belong. Make it sound human, natural, and urgent. Reply with the message only."
+)
+
+# === TEMPLATE CACHE ===
+# Emergency messages only differ in time and location, so they are written
+# ahead of time and filled in at dispatch; an alert never waits on the LLM and
+# still has a message when the device is offline.
+class MessageTemplates:
+    def __init__(self, path=MESSAGE_TEMPLATES, name=USER_NAME):
+        self.path = path
+        self.name = name
+        self.templates = list(DEFAULT_TEMPLATES)
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.templates = [t for t in json.load(f) if self.is_valid(t)] or self.templates
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.templates, f, indent=2)
+
+    def render(self, time, location):
+        with self._lock:
+            template = random.choice(self.templates)
+        text = template.format(name=self.name, time=time, location=location)
+        if str(time) not in text or str(location) not in text:
+            text = DEFAULT_TEMPLATES[0].format(name=self.name, time=time, location=location)
+        return text
+
+    # A template must fill in both the time and the map link. Rendering with
+    # sentinel values catches escaped braces ("{{time}}" renders as "{time}").
+    @staticmethod
+    def is_valid(template):
+        if not isinstance(template, str) or "{{" in template or "}}" in template:
+            return False
+        try:
+            text = template.format(name="\x00name", time="\x00time", location="\x00location")
+        except (KeyError, IndexError, ValueError):
+            return False
+        return "\x00time" in text and "\x00location" in text
+
+    # `generate(prompt)` is the LLM call (e.g. Cohere); replies that don't keep
+    # the placeholders are dropped, and the built-in templates stay if none do.
+    def refine(self, generate, count=REFINED_TEMPLATES):
+        refined = []
+        for _ in range(count):
+            try:
+                text = generate(REFINE_PROMPT).strip()
+            except Exception as e:
+                print("⚠ Message template refinement failed:", e)
+                break
+            if self.is_valid(text) and text not in refined:
+                refined.append(text)
+        if refined:
+            with self._lock:
+                self.templates = refined
+            self.save()
+            print(f"📝 {len(refined)} emergency message template(s) cached.")
+        return refined
+
+    def refine_in_background(self, generate, count=REFINED_TEMPLATES):
+        thread = threading.Thread(target=self.refine, args=(generate, count), name="template-refine", daemon=True)
+        thread.start()
+        return thread
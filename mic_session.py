@@ -0,0 +1,84 @@
+import queue
+import threading
+import numpy as np
+from audio_stream import get_capture
+from model_registry import get_vad_model
+from streaming_vad import StreamingVAD, follow_frames, SILENCE_THRESHOLD
+
+# === MIC SESSION CONFIG ===
+NOISE_EMA_ALPHA = 0.05        # per 32 ms frame, about a 0.6 s time constant
+SPEECH_ENERGY_RATIO = 2.0     # speech must be this many times louder than the noise floor
+MIN_NOISE_FLOOR = 1e-4
+
+def frame_energy(frame):
+    return float(np.sqrt(np.mean(np.square(frame)))) if len(frame) else 0.0
+
+# === PERSISTENT MICROPHONE SESSION ===
+# One thread follows the shared capture stream for as long as the session
+# lives and is the only user of its VAD. Frames the VAD calls silent update an
+# exponential average of the noise energy, so the speech threshold is already
+# current when a turn starts and no per-turn ambient calibration is needed.
+# Segments quieter than the threshold (VAD false positives on background
+# chatter or hum) are dropped, as are segments that began before listen() was
+# called: those are the tail of the AI's own voice, which the always-open
+# stream hears while the reply plays.
+class MicrophoneSession:
+    def __init__(self, capture=None, vad_model=None, alpha=NOISE_EMA_ALPHA, ratio=SPEECH_ENERGY_RATIO):
+        self.capture = capture or get_capture()
+        self.vad = StreamingVAD(vad_model or get_vad_model())
+        self.alpha = alpha
+        self.ratio = ratio
+        self.noise_floor = None
+        self._since = 0
+        self._listening = threading.Event()
+        self._segments = queue.Queue()
+        threading.Thread(target=self._run, name="mic-session", daemon=True).start()
+
+    @property
+    def energy_threshold(self):
+        return max(self.noise_floor or 0.0, MIN_NOISE_FLOOR) * self.ratio
+
+    def _update_noise(self, frame):
+        energy = frame_energy(frame)
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        else:
+            self.noise_floor += self.alpha * (energy - self.noise_floor)
+
+    def _run(self):
+        ring = self.capture.ring
+        for _, frame, events in follow_frames(self.capture, self.vad):
+            if not self.vad.in_speech and self.vad.last_prob < SILENCE_THRESHOLD:
+                self._update_noise(frame)
+            if not self._listening.is_set():
+                continue
+            for event in events:
+                if event["type"] != "end" or event["start"] < self._since:
+                    continue
+                start = max(event["start"], ring.total_written - ring.capacity)
+                segment = ring.read_range(start, event["end"]).copy()
+                if frame_energy(segment) >= self.energy_threshold:
+                    self._segments.put(segment)
+
+    # Returns the next speech segment, or None after `timeout` seconds.
+    def listen(self, timeout=None):
+        self._since = self.capture.ring.total_written
+        while not self._segments.empty():
+            self._segments.get_nowait()
+        self._listening.set()
+        try:
+            return self._segments.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        finally:
+            self._listening.clear()
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_mic_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = MicrophoneSession()
+        return _session
@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import time
+import threading
+
+# === MODEL CACHE CONFIG ===
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "distress_models")
+WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL") or "base"
+SILERO_REPO = "snakers4/silero-vad"
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# === PROCESS-WIDE REGISTRY ===
+_models = {}
+_load_stats = {}
+_registry_lock = threading.Lock()
+_model_locks = {}
+
+def _rss_mb():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+def _get(name, loader):
+    if name in _models:
+        return _models[name]
+    with _registry_lock:
+        lock = _model_locks.setdefault(name, threading.Lock())
+    with lock:
+        if name not in _models:
+            rss_before = _rss_mb()
+            start = time.perf_counter()
+            _models[name] = loader()
+            rss_after = _rss_mb()
+            _load_stats[name] = {
+                "load_seconds": round(time.perf_counter() - start, 3),
+                "rss_mb": round(rss_after, 1) if rss_after is not None else None,
+                "rss_delta_mb": round(rss_after - rss_before, 1) if rss_after is not None else None,
+            }
+            print(f"✅ Loaded {name} in {_load_stats[name]['load_seconds']:.2f}s")
+    return _models[name]
+
+def is_loaded(name):
+    return name in _models
+
+# === LOADERS ===
+def _load_silero():
+    import torch
+    hub_dir = os.path.join(MODEL_CACHE_DIR, "torch_hub")
+    torch.hub.set_dir(hub_dir)
+    local_repo = os.path.join(hub_dir, SILERO_REPO.replace("/", "_") + "_master")
+    if os.path.isdir(local_repo):
+        return torch.hub.load(repo_or_dir=local_repo, model="silero_vad", source="local")
+    print("⬇ Silero VAD not cached yet, fetching it once...")
+    return torch.hub.load(repo_or_dir=SILERO_REPO, model="silero_vad", force_reload=False, trust_repo=True)
+
+def _load_encoder():
+    from resemblyzer import VoiceEncoder
+    return VoiceEncoder(verbose=False)
+
+def _load_whisper(name):
+    import whisper
+    return whisper.load_model(name, download_root=os.path.join(MODEL_CACHE_DIR, "whisper"))
+
+def get_vad_model():
+    return _get("silero_vad", _load_silero)[0]
+
+def get_vad_utils():
+    return _get("silero_vad", _load_silero)[1]
+
+def get_encoder():
+    return _get("resemblyzer", _load_encoder)
+
+def get_whisper_model(name=WHISPER_MODEL_NAME):
+    return _get(f"whisper_{name}", lambda: _load_whisper(name))
+
+MODEL_GETTERS = {
+    "vad": get_vad_model,
+    "encoder": get_encoder,
+    "whisper": get_whisper_model,
+}
+
+# === WARM START ===
+def prewarm(names=("vad", "encoder", "whisper"), background=True):
+    def warm():
+        for name in names:
+            try:
+                MODEL_GETTERS[name]()
+            except Exception as e:
+                print(f"⚠ Could not pre-load {name}:", e)
+
+    if not background:
+        warm()
+        return None
+    thread = threading.Thread(target=warm, name="model-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+def load_report():
+    return {name: dict(stats) for name, stats in _load_stats.items()}
+
+# === STARTUP BENCHMARK ===
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure cold-start load time and memory for each model.")
+    parser.add_argument("models", nargs="*", default=list(MODEL_GETTERS), choices=list(MODEL_GETTERS))
+    parser.add_argument("--json", help="Write the report to this file as well.")
+    args = parser.parse_args()
+
+    prewarm(args.models, background=False)
+    report = {
+        "cache_dir": MODEL_CACHE_DIR,
+        "whisper_model": WHISPER_MODEL_NAME,
+        "models": load_report(),
+    }
+    for name, stats in report["models"].items():
+        print(f"{name:<16} {stats['load_seconds']:>7.2f}s  rss={stats['rss_mb']} MB  (+{stats['rss_delta_mb']} MB)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
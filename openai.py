@@ -1,40 +1,48 @@
 import os
 import numpy as np
 import torch
-import sounddevice as sd
-import soundfile as sf
-from resemblyzer import VoiceEncoder, preprocess_wav
+from resemblyzer import preprocess_wav
 from scipy.spatial.distance import cosine
-import whisper
-import librosa
+from audio_stream import get_capture
+from audio_buffer import AudioBuffer
+from model_registry import get_vad_model, prewarm
+from whisper_pool import get_whisper, warm_whisper
+from streaming_transcriber import StreamingTranscriber, transcribe_while_recording
+from streaming_vad import StreamingVAD, listen_for_speech
+from recognizer import get_recognizer, RecognitionError
+from acoustic_kws import AcousticKeywordSpotter, wait_for_trigger, KWS_TEMPLATES
+from alert_dispatcher import dispatch_alerts
+from mail_transport import SMTPTransport
+from attachments import encode_attachment, attach_file
+from message_templates import MessageTemplates, MESSAGE_TEMPLATES
+from incident_manager import IncidentManager
+from listener_daemon import ListenerDaemon, TriplePressTrigger, HotwordTrigger, ScheduleTrigger
+from location_provider import LocationProvider, ip_location, describe_fix, LOCATION_MAX_AGE
+from location_service import BrowserLocationService, format_trail
 import difflib
 import re
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
 import json
 from collections import Counter
-import speech_recognition as sr
 from datetime import datetime
+import time
 import cohere
 from twilio.rest import Client as TwilioClient
+from twilio.http.http_client import TwilioHttpClient
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, render_template_string
-import threading
-import webbrowser
-import geocoder
 
 # === CONFIGURATION ===
 REGISTERED_EMBEDDING = "registered_embed.npy"
 REGISTERED_AUDIO = "registered_audio.wav"
-LIVE_AUDIO = "live_audio.wav"
-AMBIENT_AUDIO = "ambient_audio.wav"
+AMBIENT_AUDIO = "ambient_audio.flac"  # .ogg for Opus
 DISTRESS_REPORT = "distress_report.txt"
 SAMPLE_RATE = 16000
 RECORD_SECONDS = 10
 AMBIENT_RECORD_SECONDS = 20
+TRIM_AMBIENT_TO_SPEECH = False   # True drops the non-speech parts of the ambient clip
+TRIGGER_TIMEOUT = 30
+CHECKIN_SECONDS = int(os.getenv("CHECKIN_SECONDS") or 0)  # 0 disables scheduled check-ins
 THRESHOLD = 0.75
 DISTRESS_KEYWORDS = [
     "help", "fire", "emergency", "danger", "call police",
@@ -53,71 +61,28 @@ TWILIO_SID = os.getenv("TWILIO_SID") or "AC6515508846e35b104184a020ff00e2d3"
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN") or "c2228dd11548aded4ad6c129ef1096bb"
 TWILIO_NUMBER = os.getenv("TWILIO_NUMBER") or "+16198808861"
 TO_NUMBER = os.getenv("TO_NUMBER") or "+919353683861"
+TWILIO_TIMEOUT = 15   # seconds per HTTP request; Twilio's default client never times out
 
 # === INIT MODELS ===
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 torch.set_num_threads(1)
+trigger_spotter = AcousticKeywordSpotter.load(KWS_TEMPLATES)
 
-print("\U0001F680 Loading models...")
-vad_model, utils = torch.hub.load(repo_or_dir="snakers4/silero-vad", model="silero_vad", force_reload=False)
-(get_speech_timestamps, _, read_audio, _, _) = utils
-encoder = VoiceEncoder()
-whisper_model = whisper.load_model("base")
-
-# === FLASK LOCATION SERVER ===
-location_data = {"lat": None, "lon": None}
-app = Flask(__name__)
-html_page = '''
-<!DOCTYPE html>
-<html><head><title>Geolocation</title></head>
-<body><h2>Allow Location Access</h2>
-<script>
-navigator.geolocation.getCurrentPosition(function(position) {
-    fetch("/send_location", {
-        method: "POST",
-        headers: {"Content-Type": "application/json"},
-        body: JSON.stringify({lat: position.coords.latitude, lon: position.coords.longitude})
-    }).then(() => document.body.innerHTML = "<h3>✅ Location Sent. You may now close this tab.</h3>");
-});
-</script>
-</body></html>
-'''
-
-@app.route('/')
-def index():
-    return render_template_string(html_page)
-
-@app.route('/send_location', methods=['POST'])
-def get_location():
-    data = request.json
-    location_data["lat"] = data.get("lat")
-    location_data["lon"] = data.get("lon")
-    return jsonify(status="success")
-
-def start_location_server():
-    threading.Thread(target=app.run, kwargs={"port": 5001, "debug": False}).start()
+# === LOCATION ===
+browser_service = BrowserLocationService()
 
-# === UTILITY FUNCTIONS ===
-def get_location_details():
-    try:
-        start_location_server()
-        webbrowser.open("http://localhost:5001")
-        import time
-        for _ in range(15):
-            if location_data["lat"] and location_data["lon"]:
-                lat = location_data["lat"]
-                lon = location_data["lon"]
-                maps_url = f"https://www.google.com/maps?q={lat},{lon}"
-                return lat, lon, "Detected via Browser", "Detected via Browser", maps_url
-            time.sleep(1)
-        g = geocoder.ip('me')
-        if g.ok and g.latlng:
-            lat, lon = g.latlng
-            return lat, lon, g.country or "Unknown", g.state or "Unknown", f"https://www.google.com/maps?q={lat},{lon}"
-    except:
-        pass
-    return None, None, "Unknown", "Unknown", "Location unavailable."
+def browser_location():
+    browser_service.start()
+    return browser_service.wait_for_fix(newer_than=time.time() - LOCATION_MAX_AGE)
+
+location = LocationProvider([browser_location, ip_location])
+browser_service.subscribe(location.update)
+mailer = SMTPTransport(EMAIL_ADDRESS, EMAIL_PASSWORD)
+messages = MessageTemplates()
+incidents = IncidentManager()
+recognizer = get_recognizer()
 
+# === UTILITY FUNCTIONS ===
 def summarize_text(text, max_sentences=3):
     sentences = re.split(r'[.!?]', text)
     word_freq = Counter(re.findall(r'\w+', text.lower()))
@@ -125,16 +90,24 @@ def summarize_text(text, max_sentences=3):
     top_sentences = [s for _, s in sorted(scored_sentences, reverse=True)[:max_sentences]]
     return ' '.join(top_sentences)
 
-def send_email_alert():
-    subject = "\U0001F6A8 Distress Signal Detected"
-    lat, lon, country, state, location_url = get_location_details()
+def send_email_alert(fix=None, incident=None):
+    update = incident["updates"] if incident else 0
+    subject = f"\U0001F6A8 Distress Update #{update} (incident {incident['id']})" if update else "\U0001F6A8 Distress Signal Detected"
+    fix = fix or location.current()
+    lat, lon, country, state, location_url = fix["lat"], fix["lon"], fix["country"], fix["state"], fix["url"]
+    headline = (
+        "\U0001F501 Update: The registered user triggered another distress signal in the same incident.\n\n"
+        if update else "\U0001F6A8 Alert: A distress signal was detected from the registered user.\n\n"
+    )
     body = (
-        "\U0001F6A8 Alert: A distress signal was detected from the registered user.\n\n"
+        headline +
         f"\U0001F30D Country: {country}\n"
         f"\U0001F3D9️ State: {state}\n"
         f"\U0001F4CD Latitude: {lat}\n"
         f"\U0001F4CD Longitude: {lon}\n"
-        f"\U0001F5FA️ Google Maps Link: {location_url}\n\n"
+        f"\U0001F5FA️ Google Maps Link: {location_url}\n"
+        f"\U0001F4E1 Fix: {describe_fix(fix)}\n"
+        f"\U0001F6B6 Recent movement:\n{format_trail(browser_service.trail()) or '  (no browser fixes yet)'}\n\n"
         "Immediate attention may be required.\n"
         "An ambient audio recording and verbal distress report are attached."
     )
@@ -145,57 +118,64 @@ def send_email_alert():
     msg.attach(MIMEText(body, "plain"))
     for attachment in [AMBIENT_AUDIO, DISTRESS_REPORT]:
         if os.path.exists(attachment):
-            with open(attachment, "rb") as f:
-                part = MIMEBase("application", "octet-stream")
-                part.set_payload(f.read())
-                encoders.encode_base64(part)
-                part.add_header("Content-Disposition", f"attachment; filename={attachment}")
-                msg.attach(part)
+            attach_file(msg, attachment)
     try:
-        server = smtplib.SMTP("smtp.gmail.com", 587)
-        server.starttls()
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
+        mailer.send(msg)
         print("📧 Email alert sent successfully.")
     except Exception as e:
         print("❌ Failed to send email:", e)
+        raise
 
-def generate_emergency_message():
+def generate_emergency_message(fix=None):
     current_time = datetime.now().strftime("%I:%M %p")
-    lat, lon, _, _, location_link = get_location_details()
-    prompt = (
-        f"Create a short emergency voice message from someone in danger. "
-        f"Name is John, time is {current_time}, and location is shared in the link: {location_link}. "
-        f"Make it sound human, natural, and urgent."
-    )
+    location_link = (fix or location.current())["url"]
+    return messages.render(current_time, location_link)
+
+def cohere_generate(prompt):
     response = co.generate(model="command", prompt=prompt, max_tokens=100, temperature=0.8)
     return response.generations[0].text.strip()
 
 def make_emergency_call(message):
-    twilio_client = TwilioClient(TWILIO_SID, TWILIO_AUTH_TOKEN)
+    twilio_client = TwilioClient(TWILIO_SID, TWILIO_AUTH_TOKEN, http_client=TwilioHttpClient(timeout=TWILIO_TIMEOUT))
     call = twilio_client.calls.create(
         to=TO_NUMBER,
         from_=TWILIO_NUMBER,
         twiml=f'<Response><Say voice="alice">{message}</Say></Response>'
     )
     print(f"📞 Emergency call triggered. Call SID: {call.sid}")
+    return call.sid
+
+def send_sms_alert(fix=None, incident=None):
+    location_link = (fix or location.current())["url"]
+    if incident and incident["updates"]:
+        body = f"🔁 Update #{incident['updates']}: distress signal repeated. Latest location: {location_link}. New details by email."
+    else:
+        body = ("🚨 Distress signal detected from registered user. Immediate action may be needed! "
+                f"Location: {location_link}. Check your email for details.")
+    twilio_client = TwilioClient(TWILIO_SID, TWILIO_AUTH_TOKEN, http_client=TwilioHttpClient(timeout=TWILIO_TIMEOUT))
+    sms = twilio_client.messages.create(
+        to=TO_NUMBER,
+        from_=TWILIO_NUMBER,
+        body=body
+    )
+    print(f"📱 SMS alert sent. Message SID: {sms.sid}")
+    return sms.sid
 
-def record_audio(filename, duration=RECORD_SECONDS):
-    print(f"\n🎤 Recording for {duration} seconds...")
-    audio = sd.rec(int(duration * SAMPLE_RATE), samplerate=SAMPLE_RATE, channels=1, dtype='float32')
-    sd.wait()
-    sf.write(filename, audio, SAMPLE_RATE, format='WAV', subtype='PCM_16')
-    print(f"✅ Audio saved: {filename}")
+def record_audio(duration=RECORD_SECONDS, preroll=False):
+    if preroll:
+        print(f"\n🎤 Collecting the last {duration} seconds of audio...")
+    else:
+        print(f"\n🎤 Recording for {duration} seconds...")
+    clip = AudioBuffer(get_capture().record(duration, preroll=preroll), SAMPLE_RATE)
+    print(f"✅ Audio captured ({clip.duration:.1f}s)")
+    return clip
 
 def record_distress_details():
     print("\n🎙️ Please describe your emergency situation (15 seconds)...")
-    record_audio("detailed_report.wav", duration=15)
     try:
-        audio, sr = librosa.load("detailed_report.wav", sr=16000, mono=True)
-        audio_tensor = torch.from_numpy(audio).float()
-        result = whisper_model.transcribe(audio_tensor.numpy(), language='en', fp16=False)
-        transcript = result.get("text", "").strip()
+        transcriber = StreamingTranscriber(get_whisper())
+        _, transcript = transcribe_while_recording(get_capture(), transcriber, 15)
+        transcript = transcript.strip()
         if not transcript:
             return None, None
         summary = summarize_text(transcript)
@@ -206,45 +186,100 @@ def record_distress_details():
         print("❌ Failed to transcribe or summarize:", e)
         return None, None
 
-def listen_and_detect():
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        print("🎙 Listening for distress keywords... Speak now.")
-        audio = r.listen(source)
+def confirm_trigger(segment, label):
+    result = get_whisper().transcribe(segment, language='en', fp16=False)
+    text = result.get("text", "").lower()
+    print("🗣 You said:", text)
+    return any(keyword in text for keyword in DISTRESS_KEYWORDS)
+
+def detect_trigger():
+    if trigger_spotter is not None:
+        print("🎙 Listening for your trigger phrase... Speak now.")
+        vad = StreamingVAD(get_vad_model())
+        hit = wait_for_trigger(get_capture(), vad, trigger_spotter, confirm=confirm_trigger, timeout=TRIGGER_TIMEOUT)
+        return hit is not None
+    print("🎙 Listening for distress keywords... Speak now.")
+    for segment in listen_for_speech(get_capture(), StreamingVAD(get_vad_model()), timeout=TRIGGER_TIMEOUT):
         try:
-            text = r.recognize_google(audio).lower()
-            print("🗣 You said:", text)
-            if any(keyword in text for keyword in DISTRESS_KEYWORDS):
-                print("🚨 Distress detected!")
-                record_audio(AMBIENT_AUDIO, duration=AMBIENT_RECORD_SECONDS)
-                transcript, summary = record_distress_details()
-                send_email_alert()
-                message = generate_emergency_message()
-                make_emergency_call(message)
-                for f in [AMBIENT_AUDIO, DISTRESS_REPORT]:
-                    if os.path.exists(f): os.remove(f)
-            else:
-                print("✅ No distress signal detected.")
-        except sr.UnknownValueError:
-            print("❌ Could not understand audio.")
-        except sr.RequestError as e:
+            text = recognizer.transcribe(segment).lower()
+        except RecognitionError as e:
             print("⚠ Speech recognition error:", e)
+            return None
+        if not text:
+            print("❌ Could not understand audio.")
+            return None
+        print("🗣 You said:", text)
+        return any(keyword in text for keyword in DISTRESS_KEYWORDS)
+    print("❌ No speech detected.")
+    return None
+
+def listen_and_detect():
+    detected = detect_trigger()
+    if detected is None:
+        return
+    if not detected:
+        print("✅ No distress signal detected.")
+        return
+    print("🚨 Distress detected!")
+    incidents.run(handle_incident)
+
+def handle_incident(incident):
+    ambient = record_audio(duration=AMBIENT_RECORD_SECONDS, preroll=True)
+    ambient_encoded = encode_attachment(ambient, AMBIENT_AUDIO, get_vad_model() if TRIM_AMBIENT_TO_SPEECH else None)
+    transcript, summary = record_distress_details()
+    try:
+        ambient_encoded.result()
+    except Exception as e:
+        # The alert must go out even without its ambient recording.
+        print("⚠ Could not encode the ambient audio; sending alerts without it:", e)
+        if os.path.exists(AMBIENT_AUDIO):
+            os.remove(AMBIENT_AUDIO)
+    fix = location.current()
+    print(f"📍 Location for this incident: {fix['url']} ({describe_fix(fix)})")
+    incidents.notify(
+        incident,
+        lambda: dispatch_alerts({
+            "email": lambda: send_email_alert(fix, incident),
+            "call": lambda: make_emergency_call(generate_emergency_message(fix)),
+            "sms": lambda: send_sms_alert(fix, incident),
+        }, incident_id=incident["id"]),
+        lambda: dispatch_alerts({
+            "email": lambda: send_email_alert(fix, incident),
+            "sms": lambda: send_sms_alert(fix, incident),
+        }, incident_id=incident["id"]),
+    )
+    remove_attachments()
+
+def remove_attachments():
+    for f in [AMBIENT_AUDIO, DISTRESS_REPORT]:
+        if os.path.exists(f):
+            os.remove(f)
+
+def handle_activation(event):
+    if event["trigger"] == "hotword":
+        print("🚨 Distress detected!")
+        incidents.run(handle_incident)
+    else:
+        listen_and_detect()
 
-def simulate_power_button_press():
-    press_count = 0
-    print("🖲 Simulating Power Button... Press Enter to simulate each press.")
-    while True:
-        input("Press Enter (power button)...")
-        press_count += 1
-        print(f"Power button pressed {press_count} time(s)")
-        if press_count == 3:
-            print("🎯 Triple press detected! Activating voice detection...")
-            listen_and_detect()
-            break
+def run_daemon():
+    get_capture()
+    location.start_background_refresh()
+    mailer.start_keepalive()
+    if not os.path.exists(MESSAGE_TEMPLATES):
+        messages.refine_in_background(cohere_generate)
+    prewarm(("vad",))
+    warm_whisper()
+    triggers = [TriplePressTrigger()]
+    if trigger_spotter is not None:
+        triggers.append(HotwordTrigger(get_capture(), get_vad_model(), trigger_spotter, confirm=confirm_trigger))
+    if CHECKIN_SECONDS:
+        triggers.append(ScheduleTrigger(CHECKIN_SECONDS))
+    ListenerDaemon(triggers, handle_activation).run_forever()
 
 # === MAIN ===
 if __name__ == "__main__":
-    simulate_power_button_press()
+    run_daemon()
 
 
 
@@ -0,0 +1,75 @@
+import os
+import abc
+import numpy as np
+
+# === RECOGNIZER CONFIG ===
+RECOGNIZER_BACKEND = os.getenv("RECOGNIZER_BACKEND") or "whisper"
+CHAT_WHISPER_MODEL = os.getenv("CHAT_WHISPER_MODEL") or "tiny.en"   # small model for conversational turns
+SAMPLE_RATE = 16000
+
+class RecognitionError(RuntimeError):
+    pass
+
+# === BACKENDS ===
+# Every backend turns 16 kHz float32 samples into text and returns "" when
+# nothing intelligible was said; a failing backend raises RecognitionError.
+class Recognizer(abc.ABC):
+    name = "recognizer"
+
+    @abc.abstractmethod
+    def transcribe(self, samples, sample_rate=SAMPLE_RATE):
+        ...
+
+class WhisperRecognizer(Recognizer):
+    name = "whisper"
+
+    # With no model name this reuses the detector's Whisper (or its worker
+    # pool); a name such as "tiny.en" loads that smaller model once instead.
+    def __init__(self, model_name=None, language="en"):
+        self.model_name = model_name
+        self.language = language
+
+    def _model(self):
+        if self.model_name is None:
+            from whisper_pool import get_whisper
+            return get_whisper()
+        from model_registry import get_whisper_model
+        return get_whisper_model(self.model_name)
+
+    def transcribe(self, samples, sample_rate=SAMPLE_RATE):
+        samples = np.asarray(samples, dtype=np.float32)
+        if sample_rate != SAMPLE_RATE:
+            import librosa
+            samples = librosa.resample(samples, orig_sr=sample_rate, target_sr=SAMPLE_RATE)
+        try:
+            result = self._model().transcribe(samples, language=self.language, fp16=False)
+        except Exception as e:
+            raise RecognitionError(f"Whisper transcription failed: {e}") from e
+        return result.get("text", "").strip()
+
+class GoogleRecognizer(Recognizer):
+    name = "google"
+
+    # `model_name` is accepted so callers can configure any backend the same way.
+    def __init__(self, model_name=None, language="en-US"):
+        self.language = language
+
+    def transcribe(self, samples, sample_rate=SAMPLE_RATE):
+        import speech_recognition as sr
+        pcm = (np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+        try:
+            return sr.Recognizer().recognize_google(sr.AudioData(pcm, sample_rate, 2), language=self.language)
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as e:
+            raise RecognitionError(f"Could not request results; {e}") from e
+
+RECOGNIZERS = {
+    "whisper": WhisperRecognizer,
+    "google": GoogleRecognizer,
+}
+
+def get_recognizer(backend=RECOGNIZER_BACKEND, **options):
+    if backend not in RECOGNIZERS:
+        raise ValueError(f"Unknown recognizer backend {backend!r}; choose from {', '.join(RECOGNIZERS)}")
+    return RECOGNIZERS[backend](**options)
@@ -0,0 +1,133 @@
+import re
+import numpy as np
+
+# === STREAMING TRANSCRIPTION CONFIG ===
+SAMPLE_RATE = 16000
+STEP_SECONDS = 2.0       # decode again after this much new audio
+WINDOW_SECONDS = 12.0    # longest uncommitted audio kept in the decode window
+PROMPT_CHARS = 200       # committed text passed back to Whisper as context
+MIN_FINAL_SECONDS = 0.3
+
+def _norm(word):
+    return re.sub(r'[^\w]', '', word.lower())
+
+# === STREAMING TRANSCRIBER ===
+# Re-decodes the uncommitted tail of the audio every STEP_SECONDS. Words are
+# committed once two consecutive hypotheses agree on them (local agreement),
+# and the committed audio is cut from the window, so each decode covers an
+# overlapping window of at most WINDOW_SECONDS. Committed text is passed back
+# as the initial prompt so later windows keep the earlier context.
+class StreamingTranscriber:
+    def __init__(self, model, language='en', sample_rate=SAMPLE_RATE, step_seconds=STEP_SECONDS,
+                 window_seconds=WINDOW_SECONDS, prompt_chars=PROMPT_CHARS):
+        self.model = model
+        self.language = language
+        self.sample_rate = sample_rate
+        self.step_seconds = step_seconds
+        self.window_seconds = window_seconds
+        self.prompt_chars = prompt_chars
+        self.reset()
+
+    def reset(self):
+        self.committed = []
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._previous = []
+        self._since_decode = 0
+
+    @property
+    def text(self):
+        return ' '.join(self.committed)
+
+    def feed(self, samples):
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        self._buffer = np.concatenate([self._buffer, samples])
+        self._since_decode += len(samples)
+        if self._since_decode < self.step_seconds * self.sample_rate:
+            return None
+        return self._decode()
+
+    def finish(self):
+        if len(self._buffer) < MIN_FINAL_SECONDS * self.sample_rate:
+            update = {"text": self.text, "new": "", "partial": ""}
+        else:
+            update = self._decode(final=True)
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._previous = []
+        self._since_decode = 0
+        return update
+
+    def _transcribe_words(self):
+        result = self.model.transcribe(
+            self._buffer, language=self.language, fp16=False, word_timestamps=True,
+            condition_on_previous_text=False, initial_prompt=self.text[-self.prompt_chars:] or None
+        )
+        return [
+            (w["word"].strip(), w["end"])
+            for segment in result.get("segments", [])
+            for w in segment.get("words", [])
+            if w["word"].strip()
+        ]
+
+    def _decode(self, final=False):
+        self._since_decode = 0
+        words = self._transcribe_words()
+        if final:
+            stable = len(words)
+        else:
+            stable = 0
+            while (stable < len(words) and stable < len(self._previous)
+                   and _norm(words[stable][0]) == _norm(self._previous[stable])):
+                stable += 1
+            buffer_seconds = len(self._buffer) / self.sample_rate
+            if buffer_seconds > self.window_seconds:
+                # Window is full: commit everything that ended before the last step.
+                while stable < len(words) and words[stable][1] <= buffer_seconds - self.step_seconds:
+                    stable += 1
+
+        new_words = [word for word, _ in words[:stable]]
+        self.committed.extend(new_words)
+        if stable:
+            cut = int(words[stable - 1][1] * self.sample_rate)
+            self._buffer = self._buffer[cut:]
+        elif len(self._buffer) > self.window_seconds * self.sample_rate:
+            self._buffer = self._buffer[-int(self.window_seconds * self.sample_rate):]
+        self._previous = [word for word, _ in words[stable:]]
+        return {"text": self.text, "new": ' '.join(new_words), "partial": ' '.join(self._previous)}
+
+# === LIVE RECORDING ===
+# Records `duration` seconds from the capture ring buffer and transcribes as
+# the audio arrives, so only the last step is left to decode when it ends.
+# `on_recorded`, if given, gets the recording as soon as the last samples
+# arrive, so other work on the clip can overlap the final decode. A failing
+# decode doesn't stop the recording, and on_recorded still gets whatever audio
+# arrived if capture stalls; the error is raised after it has run.
+def transcribe_while_recording(capture, transcriber, duration, on_recorded=None):
+    ring = capture.ring
+    start = ring.total_written
+    end = start + int(duration * capture.sample_rate)
+    step = int(transcriber.step_seconds * capture.sample_rate)
+    cursor = start
+    error = None
+    try:
+        while cursor < end:
+            if not ring.wait_for(min(cursor + step, end), timeout=transcriber.step_seconds + 5):
+                raise RuntimeError("Audio capture stalled; no samples received from the microphone.")
+            target = min(ring.total_written, end)
+            if error is None:
+                try:
+                    update = transcriber.feed(ring.read_range(cursor, target).copy())
+                except Exception as e:
+                    error = e
+                    print("⚠ Transcription failed, still recording:", e)
+                    update = None
+                if update and update["new"]:
+                    print("📝 ...", update["text"])
+            cursor = target
+    finally:
+        recording = ring.read_range(start, cursor).copy()
+        if on_recorded is not None:
+            on_recorded(recording)
+    if error is not None:
+        raise error
+    update = transcriber.finish()
+    return recording, update["text"]
@@ -0,0 +1,136 @@
+import numpy as np
+import torch
+
+# === STREAMING VAD CONFIG ===
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 512  # 32 ms, the frame size Silero expects at 16 kHz
+SPEECH_THRESHOLD = 0.5
+SILENCE_THRESHOLD = 0.35
+MIN_SPEECH_MS = 250
+MIN_SILENCE_MS = 300
+SPEECH_PAD_MS = 100
+MAX_SPEECH_SECONDS = 30
+
+# === FRAME-LEVEL SEGMENTER ===
+# Events are dicts like Silero's own timestamps: {"type": "start", "start": n}
+# once speech has lasted MIN_SPEECH_MS, and {"type": "end", "start": n, "end": m}
+# after MIN_SILENCE_MS of silence. Sample indices count from the first frame fed.
+class StreamingVAD:
+    def __init__(self, model, sample_rate=SAMPLE_RATE, threshold=SPEECH_THRESHOLD,
+                 silence_threshold=SILENCE_THRESHOLD, min_speech_ms=MIN_SPEECH_MS,
+                 min_silence_ms=MIN_SILENCE_MS, speech_pad_ms=SPEECH_PAD_MS,
+                 max_speech_seconds=MAX_SPEECH_SECONDS):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.silence_threshold = silence_threshold
+        self.min_speech = sample_rate * min_speech_ms // 1000
+        self.min_silence = sample_rate * min_silence_ms // 1000
+        self.speech_pad = sample_rate * speech_pad_ms // 1000
+        self.max_speech = int(sample_rate * max_speech_seconds)
+        self.reset()
+
+    def reset(self):
+        self.model.reset_states()
+        self.position = 0
+        self.triggered = False
+        self.last_prob = 0.0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._speech_start = None
+        self._silence_start = None
+
+    @property
+    def in_speech(self):
+        return self._speech_start is not None
+
+    def process_frame(self, frame):
+        with torch.no_grad():
+            prob = self.model(torch.from_numpy(frame), self.sample_rate).item()
+        self.last_prob = prob
+        frame_start = self.position
+        self.position += len(frame)
+        events = []
+
+        if prob >= self.threshold:
+            self._silence_start = None
+            if self._speech_start is None:
+                self._speech_start = frame_start
+            if not self.triggered and self.position - self._speech_start >= self.min_speech:
+                self.triggered = True
+                self._speech_start = max(0, self._speech_start - self.speech_pad)
+                events.append({"type": "start", "start": self._speech_start})
+        elif self._speech_start is not None and prob < self.silence_threshold:
+            if self._silence_start is None:
+                self._silence_start = frame_start
+            if self.position - self._silence_start >= self.min_silence:
+                if self.triggered:
+                    end = min(self.position, self._silence_start + self.speech_pad)
+                    events.append({"type": "end", "start": self._speech_start, "end": end})
+                self._close_segment()
+
+        if self.triggered and self.position - self._speech_start >= self.max_speech:
+            events.append({"type": "end", "start": self._speech_start, "end": self.position})
+            self._close_segment()
+        return events
+
+    def _close_segment(self):
+        self.triggered = False
+        self._speech_start = None
+        self._silence_start = None
+
+    def process(self, samples):
+        samples = np.concatenate([self._pending, np.asarray(samples, dtype=np.float32).reshape(-1)])
+        events = []
+        n_frames = len(samples) // FRAME_SAMPLES
+        for i in range(n_frames):
+            events.extend(self.process_frame(samples[i * FRAME_SAMPLES:(i + 1) * FRAME_SAMPLES]))
+        self._pending = samples[n_frames * FRAME_SAMPLES:].copy()
+        return events
+
+    def flush(self):
+        events = []
+        if self.triggered:
+            events.append({"type": "end", "start": self._speech_start, "end": self.position})
+        self._close_segment()
+        return events
+
+# === LIVE LISTENER ===
+# Follows the capture ring buffer frame by frame, blocking on its condition
+# variable between frames. Yields (end, frame, events) with `end` and the event
+# sample indices given as absolute positions in the ring buffer.
+def follow_frames(capture, vad):
+    ring = capture.ring
+    vad.reset()
+    origin = cursor = ring.total_written
+    while True:
+        if not ring.wait_for(cursor + FRAME_SAMPLES, timeout=1.0):
+            raise RuntimeError("Audio capture stalled; no samples received from the microphone.")
+        if cursor < ring.total_written - ring.capacity:
+            # Fell behind the writer: drop the lost audio and start over.
+            vad.reset()
+            origin = cursor = ring.total_written - FRAME_SAMPLES
+        frame = ring.read_range(cursor, cursor + FRAME_SAMPLES).copy()
+        cursor += FRAME_SAMPLES
+        events = vad.process_frame(frame)
+        for event in events:
+            event["start"] += origin
+            if "end" in event:
+                event["end"] += origin
+        yield cursor, frame, events
+
+# Yields each finished speech segment as audio; stops after `timeout` seconds
+# without speech, or as soon as `stop()` (checked every frame) returns true.
+def listen_for_speech(capture, vad, timeout=None, stop=None):
+    ring = capture.ring
+    waited = 0.0
+    frame_seconds = FRAME_SAMPLES / capture.sample_rate
+    for _, _, events in follow_frames(capture, vad):
+        if stop is not None and stop():
+            return
+        for event in events:
+            if event["type"] == "end":
+                start = max(event["start"], ring.total_written - ring.capacity)
+                yield ring.read_range(start, event["end"]).copy()
+        waited = 0.0 if vad.in_speech else waited + frame_seconds
+        if timeout is not None and waited >= timeout:
+            return
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from intent_engine import IntentEngine, Conversation
+
+@pytest.fixture(scope="module")
+def engine():
+    return IntentEngine.load("en", directory=os.path.join(ROOT, "intents"))
+
+def respond(engine, text):
+    return Conversation(engine).respond(text)
+
+@pytest.mark.parametrize("text", [
+    "stand by me",
+    "I walked by the park",
+    "they are following me",
+    "I saw him",
+    "hit the road",
+    "this is nice",
+])
+def test_short_patterns_do_not_match_unrelated_words(engine, text):
+    reply = respond(engine, text)
+    assert reply["intent"] is None
+    assert not reply["end"]
+
+@pytest.mark.parametrize("text", ["bye", "good bye", "goodbye then", "okay bye for now"])
+def test_goodbye_ends_the_call(engine, text):
+    reply = respond(engine, text)
+    assert reply["intent"] == "goodbye"
+    assert reply["end"]
+
+@pytest.mark.parametrize("text, intent", [
+    ("hi", "greeting"),
+    ("hello there", "greeting"),
+    ("how are you", "how_are_you"),
+    ("I'm good", "doing_well"),
+    ("I'm so nervous", "scared"),
+    ("I'm walking home", "walking"),
+])
+def test_intents(engine, text, intent):
+    assert respond(engine, text)["intent"] == intent
+
+def test_longer_words_still_absorb_asr_slips(engine):
+    assert respond(engine, "I'm so scarred")["intent"] == "scared"
+
+def test_context_gates_follow_up_intents(engine):
+    conversation = Conversation(engine)
+    assert conversation.respond("someone is following me")["intent"] is None
+    assert conversation.respond("do you see anyone around")["intent"] == "surroundings"
+    assert conversation.respond("a man is following me")["intent"] == "describes_person"
@@ -0,0 +1,73 @@
+import difflib
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_spotter import KeywordSpotter, normalize_tokens, similarity
+
+# Mirrors DISTRESS_KEYWORDS in voice_detect.py (importing it loads the models).
+DISTRESS_KEYWORDS = [
+    "help", "fire", "emergency", "danger", "call police",
+    "i need help", "please help", "i'm in trouble", "save me", "help me"
+]
+
+# The difflib loop voice_detect used before the spotter replaced it.
+def baseline_detect(transcript):
+    words = normalize_tokens(transcript)
+    strong_matches = 0
+    partial_matches = 0
+    for keyword in DISTRESS_KEYWORDS:
+        kw_words = normalize_tokens(keyword)
+        if all(difflib.get_close_matches(word, words, n=1, cutoff=0.8) for word in kw_words):
+            strong_matches += 1
+        elif any(difflib.get_close_matches(word, words, n=1, cutoff=0.7) for word in kw_words):
+            partial_matches += 1
+    return strong_matches >= 1 or (strong_matches == 0 and partial_matches >= 2)
+
+@pytest.fixture(scope="module")
+def spotter():
+    return KeywordSpotter(DISTRESS_KEYWORDS)
+
+@pytest.mark.parametrize("transcript", [
+    "Call the police!",
+    "Somebody call the police now",
+    "Im in big trouble",
+    "dangerous",
+    "I need some help",
+    "Please, somebody help",
+    "helps",
+])
+def test_distress_phrases_are_detected(spotter, transcript):
+    assert baseline_detect(transcript)
+    assert spotter.detect(normalize_tokens(transcript))
+
+@pytest.mark.parametrize("transcript", [
+    "What a lovely afternoon",
+    "I am going to the store",
+    "This is fine",
+])
+def test_ordinary_speech_is_not_detected(spotter, transcript):
+    assert not baseline_detect(transcript)
+    assert not spotter.detect(normalize_tokens(transcript))
+
+def test_gap_is_bounded(spotter):
+    assert not {m["phrase"] for m in spotter.scan(normalize_tokens("call me when you are at the police"))} & {"call police"}
+
+def test_similarity_is_never_below_difflib():
+    rng = random.Random(0)
+    for _ in range(2000):
+        a = "".join(rng.choice("abcde") for _ in range(rng.randint(1, 8)))
+        b = "".join(rng.choice("abcde") for _ in range(rng.randint(1, 8)))
+        assert similarity(a, b) >= difflib.SequenceMatcher(None, a, b).ratio() - 1e-9
+
+def test_similarity_matches_difflib_on_asr_slips():
+    for a, b in [("help", "helps"), ("danger", "dangerous"), ("police", "polite"), ("fire", "hire")]:
+        assert similarity(a, b) == pytest.approx(difflib.SequenceMatcher(None, a, b).ratio())
+
+def test_fuzzy_lookup_reaches_exact_cutoff():
+    assert KeywordSpotter(["helps"])._fuzzy_lookup("help", 0.8)
+    assert KeywordSpotter(["danger"])._fuzzy_lookup("dangerous", 0.8) == (("danger", 0.8),)
@@ -0,0 +1,132 @@
+import os
+import queue
+import hashlib
+import threading
+import pyttsx3
+from audio_player import get_player
+
+# === TTS CONFIG ===
+TTS_CACHE_DIR = "tts_cache"
+TTS_RATE = 160
+TTS_VOLUME = 1.0
+TTS_VOICE_INDEX = 1          # second installed voice when there is one
+CACHE_AFTER_USES = 2         # live-spoken lines are rendered once used this often
+
+# === TTS SERVICE ===
+# pyttsx3 engines must be driven from the thread that created them, so one
+# engine lives on a worker thread for the whole process and takes jobs from a
+# queue. Lines are rendered to WAV files keyed by text, voice and rate, loaded
+# once into the shared playback engine, and played from memory afterwards.
+class TTSService:
+    def __init__(self, cache_dir=TTS_CACHE_DIR, rate=TTS_RATE, volume=TTS_VOLUME, voice_index=TTS_VOICE_INDEX):
+        self.cache_dir = cache_dir
+        self.rate = rate
+        self.volume = volume
+        self.voice_index = voice_index
+        self.voices = []
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue()
+        self._ready = threading.Event()
+        self._error = None
+        os.makedirs(cache_dir, exist_ok=True)
+        threading.Thread(target=self._run, name="tts-engine", daemon=True).start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        try:
+            engine = pyttsx3.init()
+            self.voices = [voice.id for voice in engine.getProperty("voices")]
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+        while True:
+            action, text, voice, rate, path, done = self._jobs.get()
+            try:
+                engine.setProperty("rate", rate)
+                engine.setProperty("volume", self.volume)
+                if voice is not None:
+                    engine.setProperty("voice", voice)
+                if action == "say":
+                    engine.say(text)
+                else:
+                    engine.save_to_file(text, path)
+                engine.runAndWait()
+            except Exception as e:
+                print("⚠ TTS job failed:", e)
+            finally:
+                done.set()
+
+    def _voice(self, voice_index):
+        if not self.voices:
+            return None
+        index = self.voice_index if voice_index is None else voice_index
+        return self.voices[index] if index < len(self.voices) else self.voices[0]
+
+    def _submit(self, action, text, voice, rate, path=None):
+        done = threading.Event()
+        self._jobs.put((action, text, voice, rate, path, done))
+        return done
+
+    def cache_path(self, text, voice_index=None, rate=None):
+        key = f"{self._voice(voice_index)}|{rate or self.rate}|{text}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".wav")
+
+    # None (no render yet, no audio device, or an unreadable file) makes
+    # speak() fall back to pyttsx3's own output.
+    def _load(self, path):
+        if not (os.path.exists(path) and os.path.getsize(path)):
+            return None
+        try:
+            return get_player().load(path)
+        except Exception as e:
+            print("⚠ Could not load cached speech:", e)
+            return None
+
+    # Returns the path of the cached WAV, rendering it first if needed.
+    def render_file(self, text, voice_index=None, rate=None):
+        path = self.cache_path(text, voice_index, rate)
+        if not os.path.exists(path):
+            # Render beside the cache entry and rename, so speak() never loads a half-written file.
+            partial = path[:-len(".wav")] + ".part.wav"
+            self._submit("render", text, self._voice(voice_index), rate or self.rate, partial).wait()
+            if os.path.exists(partial):
+                os.replace(partial, path)
+        return path
+
+    def render(self, text, voice_index=None, rate=None):
+        return self._load(self.render_file(text, voice_index, rate))
+
+    # Renders in the background; the lines play from memory once ready.
+    def prerender(self, lines, voice_index=None, rate=None):
+        def run():
+            for line in lines:
+                self.render(line, voice_index, rate)
+        thread = threading.Thread(target=run, name="tts-prerender", daemon=True)
+        thread.start()
+        return thread
+
+    def speak(self, text, voice_index=None, rate=None):
+        sound = self._load(self.cache_path(text, voice_index, rate))
+        if sound is not None:
+            get_player().play_voice(sound)
+            return
+        self._submit("say", text, self._voice(voice_index), rate or self.rate).wait()
+        with self._lock:
+            self._uses[text] = uses = self._uses.get(text, 0) + 1
+        if uses >= CACHE_AFTER_USES:
+            self.prerender([text], voice_index, rate)
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_tts():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TTSService()
+        return _service
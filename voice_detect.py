@@ -1,22 +1,29 @@
 import os
 import numpy as np
 import torch
-import sounddevice as sd
-import soundfile as sf
-from resemblyzer import VoiceEncoder, preprocess_wav
-from scipy.spatial.distance import cosine
-import whisper
-import librosa
-import difflib
-import re
+from resemblyzer import preprocess_wav
+from audio_stream import get_capture
+from streaming_vad import StreamingVAD, follow_frames, listen_for_speech
+from streaming_transcriber import StreamingTranscriber
+from acoustic_kws import AcousticKeywordSpotter, enroll_templates, wait_for_trigger, KWS_TEMPLATES
+from audio_buffer import AudioBuffer
+from model_registry import get_vad_model, get_vad_utils, get_encoder, prewarm
+from whisper_pool import get_whisper, warm_whisper
+from detection_pipeline import verify_and_transcribe
+from embedding_store import EmbeddingStore
+from keyword_spotter import KeywordSpotter, normalize_tokens, STRONG_CUTOFF, PARTIAL_CUTOFF, MIN_PARTIAL_HITS
+from incident_manager import IncidentManager
 import requests
 
 # === CONFIGURATION ===
-REGISTERED_EMBEDDING = "registered_embed.npy"
+REGISTERED_EMBEDDING = "registered_embed.npy"  # legacy single-user enrollment, imported on first run
+ENROLLMENT_DIR = "enrollments"
+REGISTERED_USER = os.getenv("REGISTERED_USER") or "default"
 REGISTERED_AUDIO = "registered_audio.wav"
-LIVE_AUDIO = "live_audio.wav"
 SAMPLE_RATE = 16000
 RECORD_SECONDS = 6
+LISTEN_TIMEOUT = 30
+STREAMING_TRANSCRIPTION = True  # transcribe while the user is still speaking
 THRESHOLD = 0.75
 DISTRESS_KEYWORDS = [
     "help", "fire", "emergency", "danger", "call police",
@@ -26,144 +33,213 @@ DISTRESS_KEYWORDS = [
 # === SMS ALERT CONFIG ===
 TRUSTED_PHONE_NUMBER = "+1234567890"  # Replace with your trusted number
 TEXTBELT_API_KEY = "textbelt"  # Use 'textbelt' for free-tier testing
+TEXTBELT_TIMEOUT = 15  # seconds
 
 # === INIT MODELS ===
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 torch.set_num_threads(1)
-
-print("🚀 Loading models...")
-vad_model, utils = torch.hub.load(repo_or_dir="snakers4/silero-vad", model="silero_vad", force_reload=False)
-(get_speech_timestamps, _, read_audio, _, _) = utils
-encoder = VoiceEncoder()
-whisper_model = whisper.load_model("base")  # You can switch to "medium" for better accuracy
+enrollments = EmbeddingStore(ENROLLMENT_DIR, legacy_path=REGISTERED_EMBEDDING)
+distress_spotter = KeywordSpotter(DISTRESS_KEYWORDS)
+trigger_spotter = AcousticKeywordSpotter.load(KWS_TEMPLATES)
+incidents = IncidentManager()
 
 # === FUNCTIONS ===
 
-def send_sms_alert():
+def send_sms_alert(incident=None):
     message = "🚨 Distress signal detected from registered user. Immediate action may be needed!"
+    if incident and incident["updates"]:
+        message = f"🔁 Update #{incident['updates']}: the registered user is still signalling distress."
     try:
         response = requests.post('https://textbelt.com/text', {
             'phone': TRUSTED_PHONE_NUMBER,
             'message': message,
             'key': TEXTBELT_API_KEY,
-        })
+        }, timeout=TEXTBELT_TIMEOUT)
         result = response.json()
         if result.get("success"):
             print("📱 SMS alert sent successfully.")
-        else:
-            print("❌ Failed to send SMS:", result)
+            return True
+        print("❌ Failed to send SMS:", result)
     except Exception as e:
         print("❌ Error sending SMS:", e)
+    return False
 
-def record_audio(filename, duration=RECORD_SECONDS):
-    print(f"\n🎤 Recording for {duration} seconds...")
-    audio = sd.rec(int(duration * SAMPLE_RATE), samplerate=SAMPLE_RATE, channels=1, dtype='float32')
-    sd.wait()
-    sf.write(filename, audio, SAMPLE_RATE, format='WAV', subtype='PCM_16')
-    print(f"✅ Audio saved: {filename}")
-
-def apply_vad(input_path, output_path):
+def record_audio(duration=RECORD_SECONDS, preroll=False):
+    if preroll:
+        print(f"\n🎤 Collecting the last {duration} seconds of audio...")
+    else:
+        print(f"\n🎤 Recording for {duration} seconds...")
+    clip = AudioBuffer(get_capture().record(duration, preroll=preroll), SAMPLE_RATE)
+    print(f"✅ Audio captured ({clip.duration:.1f}s)")
+    return clip
+
+def record_speech(timeout=LISTEN_TIMEOUT):
+    print(f"\n🎤 Waiting for speech (up to {timeout} seconds of silence)...")
+    vad = StreamingVAD(get_vad_model())
+    for segment in listen_for_speech(get_capture(), vad, timeout=timeout):
+        clip = AudioBuffer(segment, SAMPLE_RATE)
+        print(f"✅ Speech captured ({clip.duration:.1f}s)")
+        return clip
+    print("❌ No speech detected.")
+    return None
+
+def apply_vad(clip):
     print("🧹 Applying VAD (voice activity detection)...")
-    wav = read_audio(input_path, sampling_rate=SAMPLE_RATE)
-    timestamps = get_speech_timestamps(wav, vad_model, sampling_rate=SAMPLE_RATE)
+    get_speech_timestamps = get_vad_utils()[0]
+    timestamps = get_speech_timestamps(clip.to_tensor(), get_vad_model(), sampling_rate=clip.sample_rate)
     if not timestamps:
         print("❌ No speech detected.")
-        return False
-    voiced = torch.cat([wav[t['start']:t['end']] for t in timestamps])
-    sf.write(output_path, voiced.numpy(), SAMPLE_RATE, format='WAV', subtype='PCM_16')
-    return True
+        return None
+    return clip.select(timestamps)
 
 def register_user():
     print("🔐 Registering user voice...")
-    record_audio(REGISTERED_AUDIO)
-    if not apply_vad(REGISTERED_AUDIO, REGISTERED_AUDIO):
+    voiced = apply_vad(record_audio())
+    if voiced is None:
         print("❌ Registration failed. No voice detected.")
         return
-    wav = preprocess_wav(REGISTERED_AUDIO)
-    embed = encoder.embed_utterance(wav)
-    np.save(REGISTERED_EMBEDDING, embed)
+    voiced.save(REGISTERED_AUDIO)
+    wav = preprocess_wav(voiced.samples, source_sr=voiced.sample_rate)
+    embed = get_encoder().embed_utterance(wav)
+    enrollments.add(REGISTERED_USER, embed)
     print("✅ Voice registered successfully.")
+    enroll_templates(get_capture(), get_vad_model())
 
-def is_registered_speaker(live_path):
+def is_registered_speaker(clip):
     try:
-        live_wav = preprocess_wav(live_path)
-        live_embed = encoder.embed_utterance(live_wav)
-        reg_embed = np.load(REGISTERED_EMBEDDING)
-        similarity = 1 - cosine(reg_embed, live_embed)
-        print(f"🧠 Voice similarity score: {similarity:.3f}")
+        live_wav = preprocess_wav(clip.samples, source_sr=clip.sample_rate)
+        live_embed = get_encoder().embed_utterance(live_wav)
+        user_id, similarity = enrollments.best_match(live_embed)
+        print(f"🧠 Voice similarity score: {similarity:.3f} (closest user: {user_id})")
         return similarity > THRESHOLD
     except Exception as e:
         print("❌ Speaker verification failed:", e)
         return False
 
 def clean_transcript(text):
-    text = re.sub(r'[^\w\s]', '', text.lower())
-    return text.split()
+    return normalize_tokens(text)
 
-def detect_distress(audio_path):
+def detect_distress(clip, min_seconds=1):
     print("🗣️ Transcribing with Whisper (no FFmpeg)...")
     try:
-        audio, sr = librosa.load(audio_path, sr=16000, mono=True)
-        if len(audio) < sr:
+        clip = clip.resample(SAMPLE_RATE)
+        if clip.duration < min_seconds:
             print("❌ Audio too short to transcribe.")
             return False
 
-        audio_tensor = torch.from_numpy(audio).float()
-        result = whisper_model.transcribe(audio_tensor.numpy(), language='en', fp16=False)
+        result = get_whisper().transcribe(clip.samples, language='en', fp16=False)
         transcript = result.get("text", "")
         print("📄 Transcript:", transcript)
+        return has_distress_keyword(transcript)
+    except Exception as e:
+        print("❌ Whisper transcription failed:", e)
+        return False
 
-        words = clean_transcript(transcript)
-        strong_matches = 0
-        partial_matches = 0
+# Acoustic trigger hits are single words or short phrases ("help", "save me")
+# well under a second long, so they skip the minimum-length check.
+def confirm_trigger(clip):
+    return detect_distress(clip, min_seconds=0)
 
-        for keyword in DISTRESS_KEYWORDS:
-            kw_words = keyword.split()
-            match_found = all(
-                difflib.get_close_matches(word, words, n=1, cutoff=0.8) for word in kw_words
-            )
-            if match_found:
-                strong_matches += 1
-            elif any(difflib.get_close_matches(word, words, n=1, cutoff=0.7) for word in kw_words):
-                partial_matches += 1
+def has_distress_keyword(transcript, verbose=True):
+    words = clean_transcript(transcript)
+    matches, strong, partial = distress_spotter.classify(words, STRONG_CUTOFF, PARTIAL_CUTOFF)
+    strong_matches = len(strong)
+    partial_matches = len(partial)
 
+    if verbose:
+        for m in matches:
+            print(f"   • '{m['phrase']}' at words {m['start']}-{m['end']} (score {m['score']:.2f})")
         print(f"🔍 Matches — Strong: {strong_matches}, Partial: {partial_matches}")
 
-        if strong_matches >= 1 or (strong_matches == 0 and partial_matches >= 2):
+    if strong_matches >= 1 or partial_matches >= MIN_PARTIAL_HITS:
+        if verbose:
             print("⚠️ Distress keyword detected.")
-            return True
+        return True
 
+    if verbose:
         print("✅ No distress keyword found.")
-        return False
-    except Exception as e:
-        print("❌ Whisper transcription failed:", e)
-        return False
+    return False
+
+def listen_for_distress(timeout=LISTEN_TIMEOUT):
+    print(f"\n🎤 Listening and transcribing as you speak (up to {timeout} seconds of silence)...")
+    capture = get_capture()
+    vad = StreamingVAD(get_vad_model())
+    transcriber = StreamingTranscriber(get_whisper())
+    speech = []
+    waited = 0.0
+    for end, frame, events in follow_frames(capture, vad):
+        starts = [event["start"] for event in events if event["type"] == "start"]
+        update = None
+        if starts:
+            speech = [capture.ring.read_range(starts[0], end).copy()]
+            update = transcriber.feed(speech[0])
+        elif speech:
+            speech.append(frame)
+            update = transcriber.feed(frame)
+        if update:
+            transcript = f"{update['text']} {update['partial']}".strip()
+            if has_distress_keyword(transcript, verbose=False):
+                print("📄 Transcript so far:", transcript)
+                print("⚠️ Distress keyword detected mid-utterance.")
+                return AudioBuffer(np.concatenate(speech), SAMPLE_RATE), transcript, True
+        if any(event["type"] == "end" for event in events):
+            transcript = transcriber.finish()["text"]
+            print("📄 Transcript:", transcript)
+            return AudioBuffer(np.concatenate(speech), SAMPLE_RATE), transcript, has_distress_keyword(transcript)
+        waited = 0.0 if vad.in_speech else waited + len(frame) / SAMPLE_RATE
+        if waited >= timeout:
+            break
+    print("❌ No speech detected.")
+    return None
+
+# Returns (verified, distress) for the next utterance, or None when listening
+# gave up without hearing anything.
+def listen_once():
+    if trigger_spotter is not None:
+        print("👂 Waiting for a trigger phrase (Whisper only runs after a candidate hit)...")
+        hit = wait_for_trigger(get_capture(), StreamingVAD(get_vad_model()), trigger_spotter)
+        if hit is None:
+            return None
+        live_clip = AudioBuffer(hit[0], SAMPLE_RATE)
+        result = verify_and_transcribe(live_clip, is_registered_speaker, confirm_trigger)
+        return result["verified"], result["analysis"]
+    if STREAMING_TRANSCRIPTION:
+        live = listen_for_distress()
+        if live is None:
+            return None
+        live_clip, _, distress = live
+        return is_registered_speaker(live_clip), distress
+    live_clip = record_speech()
+    if live_clip is None:
+        return None
+    result = verify_and_transcribe(live_clip, is_registered_speaker, detect_distress)
+    return result["verified"], result["analysis"]
 
 # === MAIN FLOW ===
 
 if __name__ == "__main__":
-    if not os.path.exists(REGISTERED_EMBEDDING):
+    if not len(enrollments):
         print("📝 No voice registered. Starting registration...")
         register_user()
         exit()
 
     print("\n🎧 Listening for possible distress call from registered user...")
-    record_audio(LIVE_AUDIO)
-    if not apply_vad(LIVE_AUDIO, LIVE_AUDIO):
-        exit()
-
-    if is_registered_speaker(LIVE_AUDIO):
-        print("✅ Voice matched with registered user.")
-        if detect_distress(LIVE_AUDIO):
-            print("⚠️ EMERGENCY DETECTED! Take immediate action!")
-            send_sms_alert()
+    prewarm(("encoder",))
+    warm_whisper()
+    while True:
+        detection = listen_once()
+        if detection is None:
+            break
+        verified, distress = detection
+        if verified:
+            print("✅ Voice matched with registered user.")
+            if distress:
+                print("⚠️ EMERGENCY DETECTED! Take immediate action!")
+                incidents.run(lambda incident: incidents.notify(incident, send_sms_alert, lambda: send_sms_alert(incident)))
+            else:
+                print("✅ Speech detected but no distress signal.")
         else:
-            print("✅ Speech detected but no distress signal.")
-    else:
-        print("❌ Speaker not recognized — skipping analysis.")
-
-    if os.path.exists(LIVE_AUDIO):
-        os.remove(LIVE_AUDIO)
+            print("❌ Speaker not recognized — skipping analysis.")
 
 
 
@@ -0,0 +1,99 @@
+import os
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from model_registry import get_whisper_model, prewarm, WHISPER_MODEL_NAME
+
+# === WORKER POOL CONFIG ===
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS") or 0)   # 0 keeps Whisper in-process
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS") or max(1, (os.cpu_count() or 1) // max(WHISPER_WORKERS, 1)))
+
+# === WORKER SIDE ===
+_worker_model_name = WHISPER_MODEL_NAME   # set per worker by _init_worker
+
+def _init_worker(threads, model_name):
+    global _worker_model_name
+    import torch
+    torch.set_num_threads(threads)
+    _worker_model_name = model_name
+    get_whisper_model(model_name)
+
+def _ready():
+    return os.getpid()
+
+def _transcribe_shared(shm_name, length, options):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        audio = np.ndarray((length,), dtype=np.float32, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+    return get_whisper_model(_worker_model_name).transcribe(audio, **options)
+
+# === POOL ===
+# Each worker process loads its own Whisper model once and runs torch with
+# WHISPER_THREADS threads, so decodes run on separate cores without the GIL.
+# Audio goes over shared memory instead of being pickled through the queue;
+# the parent unlinks the block when the job finishes. `transcribe()` has the
+# same signature as the model's, so callers can use either interchangeably.
+class WhisperPool:
+    def __init__(self, workers=WHISPER_WORKERS, threads=WHISPER_THREADS, model_name=WHISPER_MODEL_NAME):
+        self.workers = workers
+        self.threads = threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(threads, model_name),
+        )
+
+    def warm(self):
+        # Submitting one job per worker up front makes the executor spawn (and
+        # so run the model-loading initializer in) every worker now.
+        for future in [self._executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+        print(f"🧵 Whisper pool ready: {self.workers} worker(s) x {self.threads} thread(s)")
+
+    def submit(self, samples, **options):
+        samples = np.ascontiguousarray(samples, dtype=np.float32).reshape(-1)
+        shm = shared_memory.SharedMemory(create=True, size=max(samples.nbytes, 1))
+        np.ndarray(samples.shape, dtype=np.float32, buffer=shm.buf)[:] = samples
+        try:
+            future = self._executor.submit(_transcribe_shared, shm.name, len(samples), options)
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+        def release(_):
+            shm.close()
+            shm.unlink()
+        future.add_done_callback(release)
+        return future
+
+    def transcribe(self, audio, **options):
+        return self.submit(audio, **options).result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Whatever answers `.transcribe(audio, **options)`: the worker pool when
+# WHISPER_WORKERS is set, otherwise the in-process model.
+def get_whisper():
+    global _pool
+    if not WHISPER_WORKERS:
+        return get_whisper_model()
+    with _pool_lock:
+        if _pool is None:
+            _pool = WhisperPool()
+        return _pool
+
+def warm_whisper(background=True):
+    if not WHISPER_WORKERS:
+        return prewarm(("whisper",), background=background)
+    if background:
+        thread = threading.Thread(target=lambda: get_whisper().warm(), name="whisper-pool-warm", daemon=True)
+        thread.start()
+        return thread
+    get_whisper().warm()